@@ -1,16 +1,27 @@
 import logging
+import multiprocessing
+import os
 import sys
 import re
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Optional, List, Dict
+from types import MappingProxyType
+from typing import Optional, List, Dict, Tuple
 from datetime import datetime
 import json
 
 import customtkinter as ctk
+import numpy as np
 from tkinter import filedialog, messagebox
 
+from core._remap import set_parallel
+from core.dxf_processor import DxfProcessor
 from core.flat_pattern_service import FlatPatternService, StretchResult
-from core.base_analyzer import BaseAnalyzer, BaseInfo, RadiusFileInfo
+from core.base_analyzer import BaseAnalyzer, BaseInfo, DxfEntry, RadiusFileInfo, WidthCheckResult
+from core.file_reader import read_many
 
 
 logging.basicConfig(
@@ -19,10 +30,238 @@ logging.basicConfig(
     handlers=[logging.StreamHandler(sys.stdout)]
 )
 
+# Номер корпуса в имени файла (тот же шаблон, что в BaseAnalyzer)
+_KORPUS_RE = re.compile(r'корп(\d+)', re.IGNORECASE)
+_OUTER_RE = re.compile(r'внешний', re.IGNORECASE)
+
+# Разделитель блоков в логе пакетной обработки
+_SEP = "=" * 70
+
+# Разделители разделов и файлов в текстовом отчёте
+_SEP_EQ = "=" * 80 + "\n"
+_SEP_DASH = "-" * 80 + "\n"
+
+# Сводка одиночной обработки
+_INFO_TMPL = (
+    "Источник: {src}\n"
+    "DXF: {dxf}\n"
+    "Текущая длина: {cur:.3f} мм\n"
+    "Ширина: {width:.3f} мм\n"
+    "Целевая длина: {target:.3f} мм\n"
+    "{action}: {delta:+.3f} мм ({percent:+.2f}%)\n"
+    "Направление: {axis}\n"
+    "Центр масштабирования: {anchor}\n"
+    "Коэффициент: {scale:.6f}\n"
+    "Результат: {out}"
+)
+_ANCHOR_NAMES = {
+    "start": "Край",
+    "center": "Центр",
+    "end": "Противоположный край"
+}
+
+
+def _classify_radius_file(file_path: Path) -> Tuple[str, bool]:
+    """Номер корпуса ("" если не найден) и признак внешнего радиуса по имени файла"""
+    name = file_path.name
+    match = _KORPUS_RE.search(name)
+    return (f"корп{match.group(1)}" if match else ""), _OUTER_RE.search(name) is not None
+
+
+def _init_worker():
+    """Инициализация процесса пула: ядро пересчёта координат — в один поток"""
+    set_parallel(False)
+
+
+def _process_one(file_path: Path, axis: str, anchor: str,
+                 bases_snapshot: Dict[str, BaseInfo],
+                 data: Optional[bytes] = None) -> Tuple[str, Optional[StretchResult], List[str]]:
+    """
+    Обрабатывает один файл радиуса (выполняется в отдельном процессе).
+
+    data — заранее прочитанное содержимое DXF; если None, файл читается с диска.
+
+    Returns:
+        (статус, результат, строки лога), где статус: "success", "skip" или "error".
+        Для файла, длина которого уже равна целевой, результат — измерение (статус "skip").
+    """
+    service = FlatPatternService()
+    analyzer = BaseAnalyzer()
+    analyzer.bases = bases_snapshot
+    lines: List[str] = []
+
+    try:
+        # Измерение текущей длины
+        if data is not None:
+            measure_result = service.measure_from_bytes(data, str(file_path), axis=axis)
+        else:
+            measure_result = service.measure(str(file_path), axis=axis)
+        current_length = measure_result.current_length
+
+        # Сопоставление с основанием
+        try:
+            radius_info = analyzer.match_radius_to_base(file_path, current_length)
+        except KeyError as e:
+            lines.append(f"    ⚠️  ПРОПУЩЕН: {e}")
+            return "skip", None, lines
+
+        target_length = radius_info.target_length
+
+        # Информация о сопоставлении
+        lines.append(f"    Тип: {radius_info.type_name}")
+        lines.append(f"    Корпус: {radius_info.korpus_number}")
+        lines.append(f"    Основание: {radius_info.base_info.file_path.name}")
+
+        if radius_info.is_outer:
+            lines.append(f"    Целевая длина: {target_length:.3f} мм (ДУГА 1 основания)")
+        else:
+            lines.append(f"    Целевая длина: {target_length:.3f} мм (ДУГА 2 основания)")
+
+        # Проверка: нужна ли обработка?
+        delta = target_length - current_length
+        if abs(delta) < 0.01:
+            lines.append(f"    ✓ Длина уже соответствует целевой, обработка не требуется")
+            return "skip", measure_result, lines
+
+        # Растяжение/сжатие
+        result = service.stretch(target_length, axis=axis, anchor=anchor)
+
+        action = "УДЛИНЕНИЕ" if result.scale >= 1.0 else "УКОРОЧЕНИЕ"
+        percent = (result.scale - 1) * 100
+
+        lines.append(f"    {action}: {current_length:.3f} -> {target_length:.3f} мм")
+        lines.append(f"    Delta: {delta:+.3f} мм ({percent:+.2f}%)")
+        lines.append(f"    Коэффициент: {result.scale:.6f}")
+        lines.append(f"    ✅ Результат: {result.stretched_dxf.name}")
+        return "success", result, lines
+
+    except Exception as exc:
+        lines.append(f"    ❌ ОШИБКА: {exc}")
+        logging.exception(f"Error processing {file_path}")
+        return "error", None, lines
+
+
+def _process_one_both_axes(file_path: Path, axis_x: str, anchor: str,
+                           korpus_widths: Dict[str, float],
+                           bases_snapshot: Dict[str, BaseInfo],
+                           measurement: Optional[Tuple[float, float]] = None) \
+        -> Tuple[str, Optional[StretchResult], List[str]]:
+    """
+    Корректирует длину и ширину одного файла радиуса (выполняется в отдельном процессе).
+
+    measurement — уже известные (длина по X, ширина по Y); если None, файл измеряется.
+
+    Returns:
+        (статус, результат, строки лога), где статус: "success", "skip" или "error"
+    """
+    analyzer = BaseAnalyzer()
+    analyzer.bases = bases_snapshot
+    dxf_proc = DxfProcessor()
+    lines: List[str] = []
+
+    try:
+        # Измерение текущих размеров (если файл не был измерен при проверке ширины).
+        # Загруженный для измерения документ используется и для растяжения
+        if measurement is not None:
+            length_x, current_width = measurement
+            loaded = False
+        else:
+            info = dxf_proc.load(str(file_path))
+            length_x, current_width = info.length_x, info.width_y
+            loaded = True
+        current_length = length_x if axis_x == "X" else current_width
+
+        # Сопоставление с основанием
+        try:
+            radius_info = analyzer.match_radius_to_base(file_path, current_length)
+        except KeyError as e:
+            lines.append(f"    ⚠️  ПРОПУЩЕН: {e}")
+            return "skip", None, lines
+
+        target_length = radius_info.target_length
+        target_width = korpus_widths.get(radius_info.korpus_number, current_width)
+
+        # Проверка необходимости обработки
+        length_delta = target_length - current_length
+        width_delta = target_width - current_width
+
+        needs_length_adj = abs(length_delta) >= 0.01
+        needs_width_adj = abs(width_delta) >= 0.01
+
+        if not needs_length_adj and not needs_width_adj:
+            lines.append(f"    ✓ Размеры уже соответствуют целевым")
+            return "skip", None, lines
+
+        # Информация о коррекции
+        lines.append(f"    Тип: {radius_info.type_name}")
+        lines.append(f"    Корпус: {radius_info.korpus_number}")
+
+        if needs_length_adj:
+            lines.append(f"    ДЛИНА (X): {current_length:.3f} → {target_length:.3f} мм (Δ {length_delta:+.3f})")
+        else:
+            lines.append(f"    ДЛИНА (X): {current_length:.3f} мм ✓")
+
+        if needs_width_adj:
+            lines.append(f"    ШИРИНА (Y): {current_width:.3f} → {target_width:.3f} мм (Δ {width_delta:+.3f})")
+        else:
+            lines.append(f"    ШИРИНА (Y): {current_width:.3f} мм ✓")
+
+        # Применяем одновременную обработку обеих осей
+        if not loaded:
+            dxf_proc.load(str(file_path))
+
+        output_file = dxf_proc.stretch_both_axes(
+            target_length_x=target_length,
+            target_width_y=target_width,
+            anchor_x=anchor,
+            anchor_y=anchor
+        )
+
+        # Создаём результат для отчёта
+        scale_x = target_length / current_length if current_length > 0 else 1.0
+        scale_y = target_width / current_width if current_width > 0 else 1.0
+
+        result = StretchResult(
+            source_file=file_path,
+            dxf_file=file_path,
+            current_length=current_length,
+            width=current_width,
+            target_length=target_length,
+            scale=scale_x,
+            axis=axis_x,
+            anchor=anchor,
+            stretched_dxf=output_file
+        )
+
+        lines.append(f"    Коэфф. X: {scale_x:.6f}, Коэфф. Y: {scale_y:.6f}")
+        lines.append(f"    ✅ Результат: {output_file.name}")
+        return "success", result, lines
+
+    except Exception as exc:
+        lines.append(f"    ❌ ОШИБКА: {exc}")
+        logging.exception(f"Error processing {file_path}")
+        return "error", None, lines
+
 
 class FlatPatternApp(ctk.CTk):
     """GUI приложения с пакетной обработкой и генерацией отчётов"""
 
+    # Варианты центра масштабирования: (подпись, значение) для каждой оси
+    _ANCHOR_X = (("Левый край", "start"), ("Центр", "center"), ("Правый край", "end"))
+    _ANCHOR_Y = (("Нижний край", "start"), ("Центр", "center"), ("Верхний край", "end"))
+    _LABELS_X = [label for label, _ in _ANCHOR_X]
+    _LABELS_Y = [label for label, _ in _ANCHOR_Y]
+    _INTERNAL_X = dict(_ANCHOR_X)
+    _INTERNAL_Y = dict(_ANCHOR_Y)
+    _LABEL_FROM_VALUE_X = {value: label for label, value in _ANCHOR_X}
+    _LABEL_FROM_VALUE_Y = {value: label for label, value in _ANCHOR_Y}
+
+    # Пакетный режим: меню центра масштабирования всегда с подписями оси X
+    _ANCHOR_MAP = MappingProxyType(dict(_ANCHOR_X))
+
+    # Сколько строк лога держать в окне
+    LOG_MAX_LINES = 500
+
     def __init__(self):
         super().__init__()
         self.title("DXF Stretcher v3.0")
@@ -40,15 +279,36 @@ class FlatPatternApp(ctk.CTk):
         self.axis_var = ctk.StringVar(value="X")
         self.anchor_var = ctk.StringVar(value="start")
         self.info_text: Optional[ctk.CTkLabel] = None
+        self._last_info: Optional[StretchResult] = None  # что сейчас показано в сводке
         self.last_result: Optional[StretchResult] = None
         
         # Переменные для пакетной обработки
         self.batch_folder_var = ctk.StringVar()
         self.batch_axis_var = ctk.StringVar(value="X")
-        self.batch_anchor_var = ctk.StringVar(value="start")
+        self.batch_anchor_var = ctk.StringVar(value="Левый край")
         self.batch_results: List[StretchResult] = []
         self.batch_log_text = None
         self.batch_bases_analyzed = False
+        self._batch_tab_built = False
+        self._action_buttons: List[ctk.CTkButton] = []
+
+        # Лог пишется через буфер: фоновые потоки только добавляют строки,
+        # в виджет их одной вставкой переносит _flush_log в потоке Tk
+        self._log_buf: "deque[str]" = deque()
+        self._worker: Optional[threading.Thread] = None
+
+        # Кэш анализа папки: (папка, последнее изменение) -> (основания, файлы радиусов)
+        self._folder_cache: Dict[Tuple[str, float], Tuple[Dict[str, BaseInfo], List[Path]]] = {}
+
+        # Проверки ширины: (папка, допуск, последнее изменение) -> результаты
+        self._width_check_cache: Dict[Tuple[str, float, float], List[WidthCheckResult]] = {}
+
+        # Измеренные длины файлов радиусов: (файл, время изменения, ось) -> длина
+        self._length_cache: Dict[Tuple[str, float, str], float] = {}
+
+        # Общий пул процессов для обработки и проверки ширины (создаётся при первом запуске)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
 
         # Шрифты (ГОСТ, при отсутствии — Arial)
         self.font_family = "GOST type A"
@@ -60,21 +320,60 @@ class FlatPatternApp(ctk.CTk):
         self.font_small = ctk.CTkFont(family=self.font_family, size=11)
         self.font_title = ctk.CTkFont(family=self.font_family, size=16, weight="bold")
 
+        # Полный лог сессии пишется в файл, в окне остаются последние строки
+        self._log_file = self._open_session_log()
+
         self._build_layout()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.after(100, self._flush_log)
+
+    def _open_session_log(self):
+        """Открывает файл лога сессии (построчная запись); при ошибке лог только в окне"""
+        log_dir = Path.home() / ".dxfstretcher" / "logs"
+        try:
+            log_dir.mkdir(parents=True, exist_ok=True)
+            return open(log_dir / f"dxf_stretcher_{datetime.now():%Y%m%d_%H%M%S}.log",
+                        "a", buffering=1, encoding="utf-8")
+        except OSError:
+            logging.exception("Cannot open session log")
+            return None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Возвращает общий пул процессов, запуская его при первом обращении"""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=_init_worker)
+            return self._pool
+
+    def _on_close(self):
+        """Закрытие окна: останавливает пул процессов, дописывает и закрывает лог сессии"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+        if self._log_file is not None:
+            self._log_file.write("".join(self._log_buf))
+            self._log_file.close()
+            self._log_file = None
+        self.destroy()
 
     # ------------------------------------------------------------------ #
     def _build_layout(self):
         """Создаёт вкладки для одиночной и пакетной обработки"""
         
         # Табы
-        self.tabview = ctk.CTkTabview(self, width=880, height=640)
+        self.tabview = ctk.CTkTabview(self, width=880, height=640, command=self._on_tab_change)
         self.tabview.pack(fill="both", expand=True, padx=10, pady=10)
         
         self.tab_single = self.tabview.add("Одиночная обработка")
         self.tab_batch = self.tabview.add("Пакетная обработка")
         
+        # Пакетная вкладка строится при первом открытии (см. _on_tab_change)
         self._build_single_tab()
-        self._build_batch_tab()
+
+    def _on_tab_change(self):
+        if self.tabview.get() == "Пакетная обработка" and not self._batch_tab_built:
+            self._batch_tab_built = True
+            self._build_batch_tab()
 
     # ------------------------------------------------------------------ #
     # ВКЛАДКА: Одиночная обработка
@@ -180,7 +479,7 @@ class FlatPatternApp(ctk.CTk):
         # Центр масштабирования
         ctk.CTkLabel(params_frame, text="Центр масштабирования:", font=self.font_regular)\
             .grid(row=1, column=0, sticky="w", padx=5, pady=(0, 4))
-        ctk.CTkOptionMenu(params_frame, values=["Левый край", "Центр", "Правый край"], 
+        ctk.CTkOptionMenu(params_frame, values=list(self._ANCHOR_MAP),
                          variable=self.batch_anchor_var,
                          font=self.font_regular).grid(row=1, column=1, sticky="ew", padx=5, pady=(0, 4))
         
@@ -199,12 +498,16 @@ class FlatPatternApp(ctk.CTk):
         buttons_frame = ctk.CTkFrame(self.tab_batch)
         buttons_frame.pack(fill="x", **padding)
 
-        ctk.CTkButton(buttons_frame, text="1. Анализировать основания", command=self._analyze_bases,
-                      font=self.font_regular, fg_color="#1f538d", height=40).pack(side="left", expand=True, padx=5)
-        ctk.CTkButton(buttons_frame, text="2. Запустить обработку", command=self._batch_process,
-                      font=self.font_regular, fg_color="#2B7A0B", height=40).pack(side="left", expand=True, padx=5)
-        ctk.CTkButton(buttons_frame, text="3. Создать отчёт", command=self._generate_report,
-                      font=self.font_regular, height=40).pack(side="left", expand=True, padx=5)
+        self.analyze_btn = ctk.CTkButton(buttons_frame, text="1. Анализировать основания",
+                                         command=self._analyze_bases,
+                                         font=self.font_regular, fg_color="#1f538d", height=40)
+        self.analyze_btn.pack(side="left", expand=True, padx=5)
+        self.process_btn = ctk.CTkButton(buttons_frame, text="2. Запустить обработку", command=self._batch_process,
+                                         font=self.font_regular, fg_color="#2B7A0B", height=40)
+        self.process_btn.pack(side="left", expand=True, padx=5)
+        self.report_btn = ctk.CTkButton(buttons_frame, text="3. Создать отчёт", command=self._generate_report,
+                                        font=self.font_regular, height=40)
+        self.report_btn.pack(side="left", expand=True, padx=5)
         ctk.CTkButton(buttons_frame, text="Очистить", fg_color="gray30", command=self._batch_clear,
                       font=self.font_regular, height=40).pack(side="left", expand=True, padx=5)
         
@@ -212,15 +515,22 @@ class FlatPatternApp(ctk.CTk):
         width_buttons_frame = ctk.CTkFrame(self.tab_batch)
         width_buttons_frame.pack(fill="x", **padding)
         
-        ctk.CTkButton(width_buttons_frame, text="🔍 Проверить ширину разверток", 
-                      command=self._check_widths,
-                      font=self.font_regular, fg_color="#8B4513", height=40).pack(side="left", expand=True, padx=5)
-        ctk.CTkButton(width_buttons_frame, text="📏 Выровнять ширину", 
-                      command=self._align_widths,
-                      font=self.font_regular, fg_color="#8B6914", height=40).pack(side="left", expand=True, padx=5)
-        ctk.CTkButton(width_buttons_frame, text="🎯 Длина + Ширина (2в1)", 
-                      command=self._batch_process_both_axes,
-                      font=self.font_regular, fg_color="#9B59B6", height=40).pack(side="left", expand=True, padx=5)
+        self.check_widths_btn = ctk.CTkButton(width_buttons_frame, text="🔍 Проверить ширину разверток", 
+                                              command=self._check_widths,
+                                              font=self.font_regular, fg_color="#8B4513", height=40)
+        self.check_widths_btn.pack(side="left", expand=True, padx=5)
+        self.align_btn = ctk.CTkButton(width_buttons_frame, text="📏 Выровнять ширину", 
+                                       command=self._align_widths,
+                                       font=self.font_regular, fg_color="#8B6914", height=40)
+        self.align_btn.pack(side="left", expand=True, padx=5)
+        self.both_axes_btn = ctk.CTkButton(width_buttons_frame, text="🎯 Длина + Ширина (2в1)", 
+                                           command=self._batch_process_both_axes,
+                                           font=self.font_regular, fg_color="#9B59B6", height=40)
+        self.both_axes_btn.pack(side="left", expand=True, padx=5)
+
+        # Кнопки, недоступные во время фоновой операции
+        self._action_buttons = [self.analyze_btn, self.process_btn, self.report_btn,
+                                self.check_widths_btn, self.align_btn, self.both_axes_btn]
 
         # Лог обработки
         log_frame = ctk.CTkFrame(self.tab_batch)
@@ -320,6 +630,7 @@ class FlatPatternApp(ctk.CTk):
         self._update_anchor_menu()
         self.status_var.set("Выберите файл и нажмите «Измерить».")
         self.info_text.configure(text="–")
+        self._last_info = None
         self.last_result = None
         self.service.clear()
 
@@ -332,22 +643,13 @@ class FlatPatternApp(ctk.CTk):
             self.target_var.set(f"{length:.3f}")
 
     def _update_anchor_menu(self):
-        axis = self.axis_var.get().upper()
-        if axis == "Y":
-            options = [("Нижний край", "start"), ("Центр", "center"), ("Верхний край", "end")]
+        if self.axis_var.get() == "Y":
+            display_values, internal_values, labels = self._LABELS_Y, self._INTERNAL_Y, self._LABEL_FROM_VALUE_Y
         else:
-            options = [("Левый край", "start"), ("Центр", "center"), ("Правый край", "end")]
-
-        display_values = [label for label, _ in options]
-        internal_values = {label: value for label, value in options}
+            display_values, internal_values, labels = self._LABELS_X, self._INTERNAL_X, self._LABEL_FROM_VALUE_X
 
         self.anchor_menu.configure(values=display_values)
-        current_label = display_values[0]
-        for label, value in options:
-            if value == self.anchor_var.get():
-                current_label = label
-                break
-        self.anchor_menu.set(current_label)
+        self.anchor_menu.set(labels.get(self.anchor_var.get(), display_values[0]))
 
         def on_select(choice: str):
             self.anchor_var.set(internal_values[choice])
@@ -355,7 +657,7 @@ class FlatPatternApp(ctk.CTk):
         self.anchor_menu.configure(command=on_select)
 
     def _current_length_for_axis(self) -> Optional[float]:
-        axis = self.axis_var.get().upper()
+        axis = self.axis_var.get()
         if self.service.current_info:
             return self.service.current_info.length_x if axis == "X" else self.service.current_info.width_y
         if self.last_result:
@@ -367,29 +669,26 @@ class FlatPatternApp(ctk.CTk):
         return None
 
     def _show_info(self, result: StretchResult):
-        anchor_names = {
-            "start": "Край",
-            "center": "Центр",
-            "end": "Противоположный край"
+        # Тот же результат уже показан — перерисовывать нечего
+        if result is self._last_info:
+            return
+
+        values = {
+            "src": result.source_file.name,
+            "dxf": result.dxf_file.name,
+            "cur": result.current_length,
+            "width": result.width,
+            "target": result.target_length,
+            "action": "Удлинение" if result.scale >= 1.0 else "Укорочение",
+            "delta": result.target_length - result.current_length,
+            "percent": (result.scale - 1) * 100,
+            "axis": result.axis,
+            "anchor": _ANCHOR_NAMES.get(result.anchor, result.anchor),
+            "scale": result.scale,
+            "out": result.stretched_dxf.name if result.stretched_dxf else "–",
         }
-        anchor_display = anchor_names.get(result.anchor, result.anchor)
-        
-        action = "Удлинение" if result.scale >= 1.0 else "Укорочение"
-        delta = result.target_length - result.current_length
-        
-        text = (
-            f"Источник: {result.source_file.name}\n"
-            f"DXF: {result.dxf_file.name}\n"
-            f"Текущая длина: {result.current_length:.3f} мм\n"
-            f"Ширина: {result.width:.3f} мм\n"
-            f"Целевая длина: {result.target_length:.3f} мм\n"
-            f"{action}: {delta:+.3f} мм ({(result.scale - 1) * 100:+.2f}%)\n"
-            f"Направление: {result.axis}\n"
-            f"Центр масштабирования: {anchor_display}\n"
-            f"Коэффициент: {result.scale:.6f}\n"
-            f"Результат: {result.stretched_dxf.name if result.stretched_dxf else '–'}"
-        )
-        self.info_text.configure(text=text)
+        self.info_text.configure(text=_INFO_TMPL.format_map(values))
+        self._last_info = result
 
     # ------------------------------------------------------------------ #
     # Пакетная обработка
@@ -401,41 +700,157 @@ class FlatPatternApp(ctk.CTk):
             self._batch_log(f"Выбрана папка: {folder}")
 
     def _batch_log(self, message: str):
-        """Добавляет сообщение в лог"""
-        if self.batch_log_text:
-            self.batch_log_text.insert("end", f"{message}\n")
+        """Добавляет сообщение в лог (можно вызывать из любого потока)"""
+        self._log_buf.append(f"{message}\n")
+
+    def _batch_log_block(self, lines: List[str]):
+        """Добавляет в лог несколько строк одной записью (блок одного файла)"""
+        if lines:
+            self._log_buf.append("\n".join(lines) + "\n")
+
+    def _flush_log(self):
+        """Раз в 100 мс переносит накопленные строки в файл и в окно одной вставкой"""
+        if self.batch_log_text and self._log_buf:
+            # popleft, а не clear(): строки, добавленные другим потоком во время
+            # сборки, останутся до следующего раза
+            text = "".join([self._log_buf.popleft() for _ in range(len(self._log_buf))])
+            if self._log_file is not None:
+                self._log_file.write(text)
+            self.batch_log_text.insert("end", text)
+
+            # В окне держим только последние LOG_MAX_LINES строк, полный лог — в файле
+            line_count = int(self.batch_log_text.index("end-1c").split(".")[0])
+            if line_count > self.LOG_MAX_LINES:
+                self.batch_log_text.delete("1.0", f"{line_count - self.LOG_MAX_LINES + 1}.0")
             self.batch_log_text.see("end")
-            self.update()
+        self.after(100, self._flush_log)
+
+    def _clear_log(self):
+        """Очищает окно лога вместе с ещё не выведенными сообщениями (в файле они остаются)"""
+        pending = "".join([self._log_buf.popleft() for _ in range(len(self._log_buf))])
+        if self._log_file is not None and pending:
+            self._log_file.write(pending)
+        if self.batch_log_text:
+            self.batch_log_text.delete("1.0", "end")
+
+    def _is_busy(self) -> bool:
+        """Проверяет, выполняется ли фоновая операция"""
+        if self._worker is not None and self._worker.is_alive():
+            messagebox.showwarning("Операция выполняется", "Дождитесь завершения текущей обработки.")
+            return True
+        return False
+
+    def _run_in_background(self, target, *args):
+        """
+        Запускает длительную операцию в фоновом потоке, чтобы не блокировать GUI.
+
+        На время операции кнопки пакетной обработки недоступны.
+        """
+        self._set_actions_state("disabled")
+        self._worker = threading.Thread(target=self._background_call, args=(target, args), daemon=True)
+        self._worker.start()
+
+    def _background_call(self, target, args):
+        try:
+            target(*args)
+        finally:
+            self.after(0, lambda: self._set_actions_state("normal"))
+
+    def _set_actions_state(self, state: str):
+        for button in self._action_buttons:
+            button.configure(state=state)
 
     def _batch_clear(self):
         self.batch_folder_var.set("")
         self.batch_results.clear()
         self.batch_bases_analyzed = False
         self.base_analyzer.bases.clear()
-        if self.batch_log_text:
-            self.batch_log_text.delete("1.0", "end")
+        self._folder_cache.clear()
+        self._width_check_cache.clear()
+        self._clear_log()
 
-    def _analyze_bases(self):
-        """Анализирует файлы оснований в выбранной папке"""
+    def _resolve_folder(self) -> Optional[Path]:
+        """
+        Возвращает выбранную папку или None (с сообщением пользователю).
+
+        Существование папки отдельно не проверяется: отсутствующую папку сообщит
+        первое же чтение каталога (FileNotFoundError).
+        """
         folder = self.batch_folder_var.get().strip()
         if not folder:
             messagebox.showwarning("Папка не выбрана", "Сначала выберите папку с файлами.")
+            return None
+        return Path(folder)
+
+    def _folder_state(self, folder_path: Path) -> Tuple[List[DxfEntry], str, float]:
+        """
+        Записи папки и ключ для кэшей папки: нормализованный путь
+        и последнее изменение (самой папки и файлов в ней).
+        """
+        # Один проход по папке на все проверки
+        entries = self.base_analyzer.scan_entries(folder_path)
+        signature = max((entry.stat().st_mtime for entry in entries), default=0.0)
+        return entries, str(folder_path.resolve()), max(signature, folder_path.stat().st_mtime)
+
+    def _cached_scan(self, folder_path: Path) -> Tuple[Dict[str, BaseInfo], List[Path]]:
+        """
+        Возвращает основания и файлы радиусов папки.
+
+        Повторный анализ выполняется только если в папке что-то изменилось
+        (по времени изменения самой папки и файлов в ней).
+        """
+        entries, folder, mtime = self._folder_state(folder_path)
+        key = (folder, mtime)
+
+        cached = self._folder_cache.get(key)
+        if cached is not None:
+            bases, radius_files = cached
+            self.base_analyzer.bases = dict(bases)
+            return self.base_analyzer.bases, list(radius_files)
+
+        bases = self.base_analyzer.analyze_folder(folder_path, entries, executor=self._get_pool())
+        radius_files = self.base_analyzer.find_radius_files(folder_path, entries)
+        self._folder_cache[key] = (dict(bases), list(radius_files))
+        return bases, radius_files
+
+    def _get_width_checks(self, folder_path: Path, tolerance: float = 0.1) -> List[WidthCheckResult]:
+        """
+        Проверка ширины с кэшем: файлы заново измеряются, только если в папке
+        что-то изменилось с прошлой проверки.
+        """
+        entries, folder, mtime = self._folder_state(folder_path)
+        key = (folder, tolerance, mtime)
+
+        cached = self._width_check_cache.get(key)
+        if cached is None:
+            cached = self.base_analyzer.check_widths(folder_path, tolerance=tolerance, entries=entries,
+                                                     executor=self._get_pool())
+            self._width_check_cache[key] = cached
+        return list(cached)
+
+    def _analyze_bases(self):
+        """Анализирует файлы оснований в выбранной папке"""
+        folder_path = self._resolve_folder()
+        if folder_path is None:
             return
-        
-        folder_path = Path(folder)
-        if not folder_path.exists():
-            messagebox.showerror("Ошибка", f"Папка не найдена: {folder}")
+
+        if self._is_busy():
             return
         
-        self.batch_log_text.delete("1.0", "end")
-        self._batch_log(f"{'='*70}")
+        self._clear_log()
+        self._batch_log(_SEP)
         self._batch_log(f"АНАЛИЗ ФАЙЛОВ ОСНОВАНИЙ")
-        self._batch_log(f"{'='*70}")
-        self._batch_log(f"Папка: {folder}")
+        self._batch_log(_SEP)
+        self._batch_log(f"Папка: {folder_path}")
         self._batch_log("")
-        
+
+        # Разбор DXF идёт в фоне; кнопки недоступны, пока анализ не закончится
+        self._run_in_background(self._analyze_bases_worker, folder_path)
+
+    def _analyze_bases_worker(self, folder_path: Path):
+        """Фоновая часть анализа оснований; окна сообщений показываются в потоке Tk"""
         try:
-            bases = self.base_analyzer.analyze_folder(folder_path)
+            bases, radius_files = self._cached_scan(folder_path)
             
             self._batch_log(f"✅ Найдено оснований: {len(bases)}")
             self._batch_log("")
@@ -452,39 +867,37 @@ class FlatPatternApp(ctk.CTk):
                 self._batch_log(f"     Разница: {base.arc1.arc_length - base.arc2.arc_length:.3f} мм")
                 self._batch_log("")
             
-            # Ищем файлы радиусов
-            radius_files = self.base_analyzer.find_radius_files(folder_path)
-            
             self._batch_log(f"📁 Найдено файлов радиусов: {len(radius_files)}")
             for rf in radius_files:
                 self._batch_log(f"   - {rf.name}")
             
             self._batch_log("")
-            self._batch_log(f"{'='*70}")
+            self._batch_log(_SEP)
             self._batch_log(f"✅ АНАЛИЗ ЗАВЕРШЁН. Можно запускать обработку!")
-            self._batch_log(f"{'='*70}")
+            self._batch_log(_SEP)
             
             self.batch_bases_analyzed = True
-            messagebox.showinfo(
-                "Анализ завершён", 
+            summary = (
                 f"Найдено оснований: {len(bases)}\n"
                 f"Найдено файлов радиусов: {len(radius_files)}\n\n"
                 f"Теперь нажмите '2. Запустить обработку'"
             )
+            self.after(0, lambda: messagebox.showinfo("Анализ завершён", summary))
             
         except FileNotFoundError as e:
             self._batch_log(f"❌ ОШИБКА: {e}")
-            messagebox.showerror("Ошибка", str(e))
+            message = str(e)
+            self.after(0, lambda: messagebox.showerror("Ошибка", message))
         except Exception as exc:
             self._batch_log(f"❌ ОШИБКА: {exc}")
             logging.exception("Analyze bases error")
-            messagebox.showerror("Ошибка анализа", str(exc))
+            message = str(exc)
+            self.after(0, lambda: messagebox.showerror("Ошибка анализа", message))
 
     def _batch_process(self):
         """Пакетная обработка с автоматическим определением целевых длин"""
-        folder = self.batch_folder_var.get().strip()
-        if not folder:
-            messagebox.showwarning("Папка не выбрана", "Выберите папку с файлами.")
+        folder_path = self._resolve_folder()
+        if folder_path is None:
             return
         
         if not self.batch_bases_analyzed or not self.base_analyzer.bases:
@@ -494,209 +907,265 @@ class FlatPatternApp(ctk.CTk):
             )
             return
 
-        folder_path = Path(folder)
-        if not folder_path.exists():
-            messagebox.showerror("Ошибка", f"Папка не найдена: {folder}")
+        if self._is_busy():
             return
 
-        # Получаем файлы радиусов
-        radius_files = self.base_analyzer.find_radius_files(folder_path)
+        axis = self.batch_axis_var.get()
+        anchor = self._ANCHOR_MAP[self.batch_anchor_var.get()]
+
+        # Процессам передаётся копия оснований, а не сам анализатор
+        bases_snapshot = dict(self.base_analyzer.bases)
+
+        self.batch_results.clear()
+        self._run_in_background(self._batch_process_worker, folder_path, axis, anchor, bases_snapshot)
+
+    def _batch_process_worker(self, folder_path: Path, axis: str, anchor: str,
+                              bases_snapshot: Dict[str, BaseInfo]):
+        """Фоновая часть пакетной обработки: файлы обрабатываются параллельно в процессах"""
+        # Получаем файлы радиусов. Основания уже проанализированы пользователем
+        # и здесь повторно не анализируются
+        try:
+            radius_files = self.base_analyzer.find_radius_files(folder_path)
+        except FileNotFoundError as exc:
+            message = str(exc)
+            self.after(0, lambda: messagebox.showerror("Ошибка", message))
+            return
+        except Exception as exc:
+            logging.exception("Folder scan error")
+            message = str(exc)
+            self.after(0, lambda: messagebox.showerror("Ошибка", message))
+            return
         
         if not radius_files:
-            messagebox.showwarning("Нет файлов", "Не найдено файлов радиусов для обработки.")
+            self.after(0, lambda: messagebox.showwarning("Нет файлов",
+                                                         "Не найдено файлов радиусов для обработки."))
             return
 
         self._batch_log("")
-        self._batch_log(f"{'='*70}")
+        self._batch_log(_SEP)
         self._batch_log(f"ПАКЕТНАЯ ОБРАБОТКА С АВТОМАТИЧЕСКИМ СОПОСТАВЛЕНИЕМ")
-        self._batch_log(f"{'='*70}")
-        self._batch_log(f"Папка: {folder}")
+        self._batch_log(_SEP)
+        self._batch_log(f"Папка: {folder_path}")
         self._batch_log(f"Найдено файлов радиусов: {len(radius_files)}")
         self._batch_log(f"")
 
-        axis = self.batch_axis_var.get()
-        anchor_map = {"Левый край": "start", "Центр": "center", "Правый край": "end"}
-        anchor = anchor_map.get(self.batch_anchor_var.get(), "start")
-
-        self.batch_results.clear()
+        results: List[StretchResult] = []
         success_count = 0
         error_count = 0
         skip_count = 0
 
-        for i, file_path in enumerate(radius_files, 1):
-            self._batch_log(f"[{i}/{len(radius_files)}] {file_path.name}")
-            
+        n_files = len(radius_files)
+        match_to_base = self.base_analyzer.match_radius_to_base
+        length_cache = self._length_cache
+        log_block = self._batch_log_block
+
+        # Файлы, которые не менялись с прошлого измерения и уже имеют целевую длину,
+        # не разбираются повторно
+        done = 0
+        to_process: List[Path] = []
+        file_keys: Dict[Path, Tuple[str, float, str]] = {}
+        for file_path in radius_files:
             try:
-                # Измерение текущей длины
-                measure_result = self.service.measure(str(file_path), axis=axis)
-                current_length = measure_result.current_length
-                
-                # Сопоставление с основанием
-                try:
-                    radius_info = self.base_analyzer.match_radius_to_base(file_path, current_length)
-                except KeyError as e:
-                    self._batch_log(f"    ⚠️  ПРОПУЩЕН: {e}")
-                    skip_count += 1
-                    self._batch_log("")
-                    continue
-                
-                target_length = radius_info.target_length
-                
-                # Информация о сопоставлении
-                self._batch_log(f"    Тип: {radius_info.type_name}")
-                self._batch_log(f"    Корпус: {radius_info.korpus_number}")
-                self._batch_log(f"    Основание: {radius_info.base_info.file_path.name}")
-                
-                if radius_info.is_outer:
-                    self._batch_log(f"    Целевая длина: {target_length:.3f} мм (ДУГА 1 основания)")
-                else:
-                    self._batch_log(f"    Целевая длина: {target_length:.3f} мм (ДУГА 2 основания)")
-                
-                # Проверка: нужна ли обработка?
-                delta = target_length - current_length
-                if abs(delta) < 0.01:
-                    self._batch_log(f"    ✓ Длина уже соответствует целевой, обработка не требуется")
-                    skip_count += 1
-                    self._batch_log("")
-                    continue
-                
-                # Растяжение/сжатие
-                result = self.service.stretch(target_length, axis=axis, anchor=anchor)
-                self.batch_results.append(result)
-                
-                action = "УДЛИНЕНИЕ" if result.scale >= 1.0 else "УКОРОЧЕНИЕ"
-                percent = (result.scale - 1) * 100
-                
-                self._batch_log(f"    {action}: {current_length:.3f} -> {target_length:.3f} мм")
-                self._batch_log(f"    Delta: {delta:+.3f} мм ({percent:+.2f}%)")
-                self._batch_log(f"    Коэффициент: {result.scale:.6f}")
-                self._batch_log(f"    ✅ Результат: {result.stretched_dxf.name}")
-                success_count += 1
-                
+                key = (str(file_path), file_path.stat().st_mtime, axis)
+                target = match_to_base(file_path, 0.0).target_length
+            except (OSError, KeyError, ValueError):
+                to_process.append(file_path)
+                continue
+            file_keys[file_path] = key
+            cached_length = length_cache.get(key)
+            if cached_length is not None and abs(target - cached_length) < 0.01:
+                done += 1
+                skip_count += 1
+                log_block([
+                    f"[{done}/{n_files}] {file_path.name}",
+                    f"    ✓ Длина не менялась и соответствует целевой ({target:.3f} мм)",
+                    "",
+                ])
+            else:
+                to_process.append(file_path)
+
+        # Все файлы читаются одной пачкой до разбора (aiofile или пул потоков),
+        # процессам передаётся уже прочитанное содержимое. Файлы одного корпуса
+        # читаются и обрабатываются подряд
+        to_process.sort(key=_classify_radius_file)
+        blobs = read_many(to_process)
+
+        executor = self._get_pool()
+        futures = {
+            executor.submit(_process_one, file_path, axis, anchor, bases_snapshot, data): file_path
+            for file_path, data in zip(to_process, blobs)
+        }
+        for i, future in enumerate(as_completed(futures), done + 1):
+            file_path = futures[future]
+            try:
+                status, result, lines = future.result()
             except Exception as exc:
-                self._batch_log(f"    ❌ ОШИБКА: {exc}")
-                error_count += 1
+                status, result, lines = "error", None, [f"    ❌ ОШИБКА: {exc}"]
                 logging.exception(f"Error processing {file_path}")
-            
-            self._batch_log("")
+                if isinstance(exc, BrokenProcessPool):
+                    # Упавший пул не восстанавливается — следующий запуск создаст новый
+                    self._pool = None
+
+            log_block([f"[{i}/{n_files}] {file_path.name}", *lines, ""])
 
-        self._batch_log(f"{'='*70}")
+            if result is not None and file_path in file_keys:
+                length_cache[file_keys[file_path]] = result.current_length
+
+            if status == "success":
+                results.append(result)
+                success_count += 1
+            elif status == "skip":
+                skip_count += 1
+            else:
+                error_count += 1
+
+        # Порядок завершения процессов случаен, отчёт строится по именам файлов
+        results.sort(key=lambda r: r.source_file.name)
+        self.batch_results[:] = results
+
+        self._batch_log(_SEP)
         self._batch_log(f"ОБРАБОТКА ЗАВЕРШЕНА")
         self._batch_log(f"✅ Успешно обработано: {success_count}")
         self._batch_log(f"⚠️  Пропущено: {skip_count}")
         self._batch_log(f"❌ Ошибок: {error_count}")
-        self._batch_log(f"{'='*70}")
+        self._batch_log(_SEP)
         
         # Автоматическая проверка ширины после обработки длин
         if success_count > 0:
             self._batch_log("")
-            self._batch_log(f"{'='*70}")
+            self._batch_log(_SEP)
             self._batch_log(f"АВТОМАТИЧЕСКАЯ ПРОВЕРКА ШИРИНЫ")
-            self._batch_log(f"{'='*70}")
+            self._batch_log(_SEP)
             try:
-                width_checks = self.base_analyzer.check_widths(folder_path, tolerance=0.1)
-                issues_found = sum(1 for check in width_checks if check.needs_adjustment)
+                width_checks = self._get_width_checks(folder_path, tolerance=0.1)
+                mismatched = [check for check in width_checks if check.needs_adjustment]
                 
-                if issues_found > 0:
-                    self._batch_log(f"⚠️  ВНИМАНИЕ: Обнаружено {issues_found} корпусов с расхождением ширины!")
+                if mismatched:
+                    self._batch_log(f"⚠️  ВНИМАНИЕ: Обнаружено {len(mismatched)} корпусов с расхождением ширины!")
                     self._batch_log("")
-                    for check in width_checks:
-                        if check.needs_adjustment:
-                            self._batch_log(f"[{check.korpus_number.upper()}] Разница: {abs(check.width_difference):.3f} мм")
+                    for check in mismatched:
+                        self._batch_log(f"[{check.korpus_number.upper()}] Разница: {abs(check.width_difference):.3f} мм")
                     self._batch_log("")
                     self._batch_log("💡 Рекомендация: Используйте кнопку '📏 Выровнять ширину'")
                 else:
                     self._batch_log(f"✅ Ширины всех разверток в норме!")
             except Exception as e:
                 self._batch_log(f"⚠️  Не удалось проверить ширину: {e}")
-            self._batch_log(f"{'='*70}")
+            self._batch_log(_SEP)
 
-        messagebox.showinfo(
+        self.after(0, lambda: messagebox.showinfo(
             "Обработка завершена", 
             f"✅ Успешно: {success_count}\n"
             f"⚠️  Пропущено: {skip_count}\n"
             f"❌ Ошибок: {error_count}"
-        )
+        ))
 
     def _check_widths(self):
         """Проверяет ширину разверток и выводит отчёт"""
-        folder = self.batch_folder_var.get().strip()
-        if not folder:
-            messagebox.showwarning("Папка не выбрана", "Сначала выберите папку с файлами.")
-            return
-        
-        folder_path = Path(folder)
-        if not folder_path.exists():
-            messagebox.showerror("Ошибка", f"Папка не найдена: {folder}")
+        folder_path = self._resolve_folder()
+        if folder_path is None or self._is_busy():
             return
         
         self._batch_log("")
-        self._batch_log(f"{'='*70}")
+        self._batch_log(_SEP)
         self._batch_log(f"ПРОВЕРКА ШИРИНЫ РАЗВЕРТОК")
-        self._batch_log(f"{'='*70}")
-        self._batch_log(f"Папка: {folder}")
+        self._batch_log(_SEP)
+        self._batch_log(f"Папка: {folder_path}")
         self._batch_log("")
         
+        # Измерение файлов идёт в фоне
+        self._run_in_background(self._check_widths_worker, folder_path)
+
+    def _check_widths_worker(self, folder_path: Path):
+        """Фоновая часть проверки ширины; окна сообщений показываются в потоке Tk"""
         try:
-            width_checks = self.base_analyzer.check_widths(folder_path, tolerance=0.1)
+            width_checks = self._get_width_checks(folder_path, tolerance=0.1)
             
             if not width_checks:
                 self._batch_log("❌ Не найдено файлов для проверки")
-                messagebox.showinfo("Проверка ширины", "Не найдено файлов для проверки")
+                self.after(0, lambda: messagebox.showinfo("Проверка ширины", "Не найдено файлов для проверки"))
                 return
             
             issues_found = sum(1 for check in width_checks if check.needs_adjustment)
+            n_checks = len(width_checks)
             
-            self._batch_log(f"Проверено корпусов: {len(width_checks)}")
+            self._batch_log(f"Проверено корпусов: {n_checks}")
             self._batch_log(f"Найдено расхождений: {issues_found}")
             self._batch_log("")
             
             for check in width_checks:
-                self._batch_log(f"[{check.korpus_number.upper()}] {check.status_message}")
+                block = [f"[{check.korpus_number.upper()}] {check.status_message}"]
                 if check.has_both_files:
                     if check.outer_file:
-                        self._batch_log(f"  ├─ Внешний: {check.outer_file.name} ({check.outer_width:.3f} мм)")
+                        block.append(f"  ├─ Внешний: {check.outer_file.name} ({check.outer_width:.3f} мм)")
                     if check.inner_file:
-                        self._batch_log(f"  └─ Внутренний: {check.inner_file.name} ({check.inner_width:.3f} мм)")
+                        block.append(f"  └─ Внутренний: {check.inner_file.name} ({check.inner_width:.3f} мм)")
                     
                     if check.needs_adjustment:
-                        self._batch_log(f"     ⚠️  ТРЕБУЕТСЯ ВЫРАВНИВАНИЕ!")
+                        block.append(f"     ⚠️  ТРЕБУЕТСЯ ВЫРАВНИВАНИЕ!")
                 else:
                     if check.outer_file:
-                        self._batch_log(f"  - Внешний: {check.outer_file.name}")
+                        block.append(f"  - Внешний: {check.outer_file.name}")
                     if check.inner_file:
-                        self._batch_log(f"  - Внутренний: {check.inner_file.name}")
-                self._batch_log("")
+                        block.append(f"  - Внутренний: {check.inner_file.name}")
+                block.append("")
+                self._batch_log_block(block)
             
-            self._batch_log(f"{'='*70}")
+            self._batch_log(_SEP)
             if issues_found > 0:
                 self._batch_log(f"⚠️  Обнаружено {issues_found} корпусов с расхождением ширины!")
                 self._batch_log(f"Нажмите '📏 Выровнять ширину' для исправления")
-                messagebox.showwarning(
+                self.after(0, lambda: messagebox.showwarning(
                     "Проверка ширины завершена",
                     f"⚠️  Обнаружено расхождений: {issues_found}\n\n"
-                    f"Проверено корпусов: {len(width_checks)}\n"
+                    f"Проверено корпусов: {n_checks}\n"
                     f"Нажмите '📏 Выровнять ширину' для исправления"
-                )
+                ))
             else:
                 self._batch_log(f"✅ Все ширины в норме!")
-                messagebox.showinfo(
+                self.after(0, lambda: messagebox.showinfo(
                     "Проверка ширины завершена",
                     f"✅ Все ширины в норме!\n\n"
-                    f"Проверено корпусов: {len(width_checks)}"
-                )
-            self._batch_log(f"{'='*70}")
+                    f"Проверено корпусов: {n_checks}"
+                ))
+            self._batch_log(_SEP)
             
+        except FileNotFoundError as exc:
+            self._batch_log(f"❌ ОШИБКА: {exc}")
+            message = str(exc)
+            self.after(0, lambda: messagebox.showerror("Ошибка", message))
         except Exception as exc:
             self._batch_log(f"❌ ОШИБКА: {exc}")
             logging.exception("Width check error")
-            messagebox.showerror("Ошибка проверки ширины", str(exc))
+            message = str(exc)
+            self.after(0, lambda: messagebox.showerror("Ошибка проверки ширины", message))
+
+    def _call_in_ui(self, func, *args):
+        """
+        Выполняет func в потоке Tk и ждёт результата (диалоги из фоновых операций).
+        Вызывать только из фонового потока.
+        """
+        done = threading.Event()
+        outcome = {}
+
+        def run():
+            try:
+                outcome["value"] = func(*args)
+            except BaseException as exc:
+                outcome["error"] = exc
+            finally:
+                done.set()
+
+        self.after(0, run)
+        done.wait()
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome.get("value")
     
     def _batch_process_both_axes(self):
         """Пакетная обработка с одновременной коррекцией длины И ширины"""
-        folder = self.batch_folder_var.get().strip()
-        if not folder:
-            messagebox.showwarning("Папка не выбрана", "Выберите папку с файлами.")
+        folder_path = self._resolve_folder()
+        if folder_path is None:
             return
         
         if not self.batch_bases_analyzed or not self.base_analyzer.bases:
@@ -706,330 +1175,309 @@ class FlatPatternApp(ctk.CTk):
             )
             return
 
-        folder_path = Path(folder)
-        if not folder_path.exists():
-            messagebox.showerror("Ошибка", f"Папка не найдена: {folder}")
+        if self._is_busy():
             return
+
+        axis_x = self.batch_axis_var.get()
+        anchor = self._ANCHOR_MAP[self.batch_anchor_var.get()]
+        bases_snapshot = dict(self.base_analyzer.bases)
+
+        # Проверка ширины (с разбором файлов) и выбор эталона — в фоне
+        self._run_in_background(self._batch_process_both_axes_worker, folder_path, axis_x, anchor,
+                                bases_snapshot)
+
+    def _ask_both_axes_reference(self, issues_found: int) -> Optional[bool]:
+        """Диалог выбора эталона ширины для обработки «2в1» (None — отмена)"""
+        dialog = ctk.CTkToplevel(self)
+        dialog.title("Одновременная коррекция длины + ширины")
+        dialog.geometry("550x300")
+        dialog.transient(self)
+        dialog.grab_set()
+        
+        selected_option = {"value": None}
+        
+        ctk.CTkLabel(
+            dialog, 
+            text="🎯 ОДНОВРЕМЕННАЯ КОРРЕКЦИЯ ДЛИНЫ И ШИРИНЫ",
+            font=self.font_title
+        ).pack(pady=15)
+        
+        ctk.CTkLabel(
+            dialog,
+            text=f"Обнаружено {issues_found} корпусов с расхождением ширины.\n"
+                 "Выберите эталонную ширину для выравнивания:",
+            font=self.font_regular,
+            text_color="#FFA500"
+        ).pack(pady=10)
+        
+        def on_choice(use_outer: bool):
+            selected_option["value"] = use_outer
+            dialog.destroy()
         
+        button_frame = ctk.CTkFrame(dialog, fg_color="transparent")
+        button_frame.pack(pady=15)
+        
+        ctk.CTkButton(
+            button_frame,
+            text="📏 ВНЕШНИЙ радиус (эталон ширины)",
+            command=lambda: on_choice(True),
+            font=self.font_regular,
+            fg_color="#2B7A0B",
+            height=50,
+            width=450
+        ).pack(pady=5)
+        
+        ctk.CTkButton(
+            button_frame,
+            text="📏 ВНУТРЕННИЙ радиус (эталон ширины)",
+            command=lambda: on_choice(False),
+            font=self.font_regular,
+            fg_color="#1f538d",
+            height=50,
+            width=450
+        ).pack(pady=5)
+        
+        ctk.CTkButton(
+            button_frame,
+            text="Отмена",
+            command=dialog.destroy,
+            font=self.font_regular,
+            fg_color="gray30",
+            height=35,
+            width=450
+        ).pack(pady=5)
+        
+        self.wait_window(dialog)
+        return selected_option["value"]
+
+    def _batch_process_both_axes_worker(self, folder_path: Path, axis_x: str, anchor: str,
+                                        bases_snapshot: Dict[str, BaseInfo]):
+        """Фоновая часть обработки «2в1»: проверка ширины, выбор эталона и обработка файлов"""
         # Проверяем ширины
         try:
-            width_checks = self.base_analyzer.check_widths(folder_path, tolerance=0.1)
-            issues_found = sum(1 for check in width_checks if check.needs_adjustment)
+            width_checks = self._get_width_checks(folder_path, tolerance=0.1)
+
+            # Один проход по проверкам: число расхождений, эталонные ширины корпусов
+            # для обоих вариантов выбора и размеры, уже измеренные при проверке
+            # (файл -> (длина по X, ширина по Y))
+            issues_found = 0
+            outer_widths: Dict[str, float] = {}
+            inner_widths: Dict[str, float] = {}
+            measurements: Dict[Path, Tuple[float, float]] = {}
+            for check in width_checks:
+                if check.needs_adjustment:
+                    issues_found += 1
+                if check.has_both_files:
+                    outer_widths[check.korpus_number] = check.outer_width
+                    inner_widths[check.korpus_number] = check.inner_width
+                if check.outer_file and check.outer_width is not None:
+                    measurements[check.outer_file] = (check.outer_length, check.outer_width)
+                if check.inner_file and check.inner_width is not None:
+                    measurements[check.inner_file] = (check.inner_length, check.inner_width)
             
             if issues_found == 0:
-                messagebox.showinfo(
+                self.after(0, lambda: messagebox.showinfo(
                     "Выравнивание не требуется", 
                     "Ширины уже одинаковы!\nДостаточно обычной обработки длин."
-                )
+                ))
                 return
             
-            # Диалог выбора эталона ширины
-            dialog = ctk.CTkToplevel(self)
-            dialog.title("Одновременная коррекция длины + ширины")
-            dialog.geometry("550x300")
-            dialog.transient(self)
-            dialog.grab_set()
-            
-            selected_option = {"value": None}
-            
-            ctk.CTkLabel(
-                dialog, 
-                text="🎯 ОДНОВРЕМЕННАЯ КОРРЕКЦИЯ ДЛИНЫ И ШИРИНЫ",
-                font=self.font_title
-            ).pack(pady=15)
-            
-            ctk.CTkLabel(
-                dialog,
-                text=f"Обнаружено {issues_found} корпусов с расхождением ширины.\n"
-                     "Выберите эталонную ширину для выравнивания:",
-                font=self.font_regular,
-                text_color="#FFA500"
-            ).pack(pady=10)
-            
-            def on_choice(use_outer: bool):
-                selected_option["value"] = use_outer
-                dialog.destroy()
-            
-            button_frame = ctk.CTkFrame(dialog, fg_color="transparent")
-            button_frame.pack(pady=15)
-            
-            ctk.CTkButton(
-                button_frame,
-                text="📏 ВНЕШНИЙ радиус (эталон ширины)",
-                command=lambda: on_choice(True),
-                font=self.font_regular,
-                fg_color="#2B7A0B",
-                height=50,
-                width=450
-            ).pack(pady=5)
-            
-            ctk.CTkButton(
-                button_frame,
-                text="📏 ВНУТРЕННИЙ радиус (эталон ширины)",
-                command=lambda: on_choice(False),
-                font=self.font_regular,
-                fg_color="#1f538d",
-                height=50,
-                width=450
-            ).pack(pady=5)
-            
-            ctk.CTkButton(
-                button_frame,
-                text="Отмена",
-                command=dialog.destroy,
-                font=self.font_regular,
-                fg_color="gray30",
-                height=35,
-                width=450
-            ).pack(pady=5)
-            
-            self.wait_window(dialog)
-            
-            if selected_option["value"] is None:
+            use_outer_width = self._call_in_ui(self._ask_both_axes_reference, issues_found)
+            if use_outer_width is None:
                 return
             
-            use_outer_width = selected_option["value"]
-            
+            # Получаем файлы радиусов (ИСХОДНЫЕ, без _stretch!)
+            _, radius_files = self._cached_scan(folder_path)
+        except FileNotFoundError as exc:
+            message = str(exc)
+            self.after(0, lambda: messagebox.showerror("Ошибка", message))
+            return
         except Exception as exc:
             logging.exception("Width check error")
-            messagebox.showerror("Ошибка проверки ширины", str(exc))
+            message = str(exc)
+            self.after(0, lambda: messagebox.showerror("Ошибка проверки ширины", message))
             return
         
-        # Получаем файлы радиусов (ИСХОДНЫЕ, без _stretch!)
-        radius_files = self.base_analyzer.find_radius_files(folder_path)
-        
         if not radius_files:
-            messagebox.showwarning("Нет файлов", "Не найдено файлов радиусов для обработки.")
+            self.after(0, lambda: messagebox.showwarning("Нет файлов",
+                                                         "Не найдено файлов радиусов для обработки."))
             return
 
         self._batch_log("")
-        self._batch_log(f"{'='*70}")
+        self._batch_log(_SEP)
         self._batch_log(f"ОДНОВРЕМЕННАЯ КОРРЕКЦИЯ ДЛИНЫ + ШИРИНЫ (2в1)")
-        self._batch_log(f"{'='*70}")
-        self._batch_log(f"Папка: {folder}")
+        self._batch_log(_SEP)
+        self._batch_log(f"Папка: {folder_path}")
         self._batch_log(f"Эталон ширины: {'ВНЕШНИЙ радиус' if use_outer_width else 'ВНУТРЕННИЙ радиус'}")
         self._batch_log(f"Найдено файлов радиусов: {len(radius_files)}")
         self._batch_log("")
 
-        axis_x = self.batch_axis_var.get()
-        anchor_map = {"Левый край": "start", "Центр": "center", "Правый край": "end"}
-        anchor = anchor_map.get(self.batch_anchor_var.get(), "start")
+        # Эталонная ширина каждого корпуса по выбранному радиусу
+        korpus_widths = outer_widths if use_outer_width else inner_widths
 
         self.batch_results.clear()
+        self._process_both_axes_files(radius_files, axis_x, anchor, korpus_widths, bases_snapshot,
+                                      measurements)
+
+    def _process_both_axes_files(self, radius_files: List[Path], axis_x: str, anchor: str,
+                                 korpus_widths: Dict[str, float],
+                                 bases_snapshot: Dict[str, BaseInfo],
+                                 measurements: Dict[Path, Tuple[float, float]]):
+        """Обработка «2в1» (в фоновом потоке): файлы обрабатываются параллельно в процессах"""
+        results: List[StretchResult] = []
         success_count = 0
         error_count = 0
         skip_count = 0
+        n_files = len(radius_files)
+        log_block = self._batch_log_block
+
+        # Файлы одного корпуса отправляются в обработку подряд
+        executor = self._get_pool()
+        futures = {
+            executor.submit(_process_one_both_axes, file_path, axis_x, anchor, korpus_widths,
+                            bases_snapshot, measurements.get(file_path)): file_path
+            for file_path in sorted(radius_files, key=_classify_radius_file)
+        }
+        for i, future in enumerate(as_completed(futures), 1):
+            file_path = futures[future]
+            try:
+                status, result, lines = future.result()
+            except Exception as exc:
+                status, result, lines = "error", None, [f"    ❌ ОШИБКА: {exc}"]
+                logging.exception(f"Error processing {file_path}")
+                if isinstance(exc, BrokenProcessPool):
+                    # Упавший пул не восстанавливается — следующий запуск создаст новый
+                    self._pool = None
 
-        # Группируем файлы по корпусам для определения эталонной ширины
-        korpus_widths = {}
-        for check in width_checks:
-            if check.has_both_files:
-                target_width = check.outer_width if use_outer_width else check.inner_width
-                korpus_widths[check.korpus_number] = target_width
+            log_block([f"[{i}/{n_files}] {file_path.name}", *lines, ""])
 
-        for i, file_path in enumerate(radius_files, 1):
-            self._batch_log(f"[{i}/{len(radius_files)}] {file_path.name}")
-            
-            try:
-                # Измерение текущих размеров
-                measure_result = self.service.measure(str(file_path), axis=axis_x)
-                current_length = measure_result.current_length
-                current_width = measure_result.width
-                
-                # Сопоставление с основанием
-                try:
-                    radius_info = self.base_analyzer.match_radius_to_base(file_path, current_length)
-                except KeyError as e:
-                    self._batch_log(f"    ⚠️  ПРОПУЩЕН: {e}")
-                    skip_count += 1
-                    self._batch_log("")
-                    continue
-                
-                target_length = radius_info.target_length
-                target_width = korpus_widths.get(radius_info.korpus_number, current_width)
-                
-                # Проверка необходимости обработки
-                length_delta = target_length - current_length
-                width_delta = target_width - current_width
-                
-                needs_length_adj = abs(length_delta) >= 0.01
-                needs_width_adj = abs(width_delta) >= 0.01
-                
-                if not needs_length_adj and not needs_width_adj:
-                    self._batch_log(f"    ✓ Размеры уже соответствуют целевым")
-                    skip_count += 1
-                    self._batch_log("")
-                    continue
-                
-                # Информация о коррекции
-                self._batch_log(f"    Тип: {radius_info.type_name}")
-                self._batch_log(f"    Корпус: {radius_info.korpus_number}")
-                
-                if needs_length_adj:
-                    self._batch_log(f"    ДЛИНА (X): {current_length:.3f} → {target_length:.3f} мм (Δ {length_delta:+.3f})")
-                else:
-                    self._batch_log(f"    ДЛИНА (X): {current_length:.3f} мм ✓")
-                
-                if needs_width_adj:
-                    self._batch_log(f"    ШИРИНА (Y): {current_width:.3f} → {target_width:.3f} мм (Δ {width_delta:+.3f})")
-                else:
-                    self._batch_log(f"    ШИРИНА (Y): {current_width:.3f} мм ✓")
-                
-                # Применяем одновременную обработку обеих осей
-                from core.dxf_processor import DxfProcessor
-                dxf_proc = DxfProcessor()
-                dxf_proc.load(str(file_path))
-                
-                output_file = dxf_proc.stretch_both_axes(
-                    target_length_x=target_length,
-                    target_width_y=target_width,
-                    anchor_x=anchor,
-                    anchor_y=anchor
-                )
-                
-                # Создаём результат для отчёта
-                scale_x = target_length / current_length if current_length > 0 else 1.0
-                scale_y = target_width / current_width if current_width > 0 else 1.0
-                
-                from core.flat_pattern_service import StretchResult
-                result = StretchResult(
-                    source_file=file_path,
-                    dxf_file=file_path,
-                    current_length=current_length,
-                    width=current_width,
-                    target_length=target_length,
-                    scale=scale_x,
-                    axis=axis_x,
-                    anchor=anchor,
-                    stretched_dxf=output_file
-                )
-                self.batch_results.append(result)
-                
-                self._batch_log(f"    Коэфф. X: {scale_x:.6f}, Коэфф. Y: {scale_y:.6f}")
-                self._batch_log(f"    ✅ Результат: {output_file.name}")
+            if status == "success":
+                results.append(result)
                 success_count += 1
-                
-            except Exception as exc:
-                self._batch_log(f"    ❌ ОШИБКА: {exc}")
+            elif status == "skip":
+                skip_count += 1
+            else:
                 error_count += 1
-                logging.exception(f"Error processing {file_path}")
-            
-            self._batch_log("")
 
-        self._batch_log(f"{'='*70}")
+        # Порядок завершения процессов случаен, отчёт строится по именам файлов
+        results.sort(key=lambda r: r.source_file.name)
+        self.batch_results[:] = results
+
+        self._batch_log(_SEP)
         self._batch_log(f"ОБРАБОТКА ЗАВЕРШЕНА")
         self._batch_log(f"✅ Успешно обработано: {success_count}")
         self._batch_log(f"⚠️  Пропущено: {skip_count}")
         self._batch_log(f"❌ Ошибок: {error_count}")
-        self._batch_log(f"{'='*70}")
+        self._batch_log(_SEP)
 
-        messagebox.showinfo(
+        self.after(0, lambda: messagebox.showinfo(
             "Обработка завершена", 
             f"✅ Успешно: {success_count}\n"
             f"⚠️  Пропущено: {skip_count}\n"
             f"❌ Ошибок: {error_count}\n\n"
             f"Одновременно скорректированы длина И ширина!"
-        )
+        ))
     
     def _align_widths(self):
         """Выравнивает ширину разверток с выбором эталона"""
-        folder = self.batch_folder_var.get().strip()
-        if not folder:
-            messagebox.showwarning("Папка не выбрана", "Сначала выберите папку с файлами.")
+        folder_path = self._resolve_folder()
+        if folder_path is None or self._is_busy():
             return
         
-        folder_path = Path(folder)
-        if not folder_path.exists():
-            messagebox.showerror("Ошибка", f"Папка не найдена: {folder}")
-            return
+        anchor = self._ANCHOR_MAP[self.batch_anchor_var.get()]
+        # Проверка ширины (с разбором файлов) и выбор эталона — в фоне
+        self._run_in_background(self._align_widths_worker, folder_path, anchor)
+
+    def _ask_width_reference(self, issues_found: int) -> Optional[bool]:
+        """Диалог выбора эталонной ширины (None — отмена)"""
+        dialog = ctk.CTkToplevel(self)
+        dialog.title("Выбор эталонной ширины")
+        dialog.geometry("500x250")
+        dialog.transient(self)
+        dialog.grab_set()
         
-        # Сначала проверяем ширины
+        selected_option = {"value": None}
+        
+        ctk.CTkLabel(
+            dialog, 
+            text="Выберите эталонную ширину для выравнивания:",
+            font=self.font_title
+        ).pack(pady=20)
+        
+        ctk.CTkLabel(
+            dialog,
+            text=f"Обнаружено {issues_found} корпусов с расхождением ширины",
+            font=self.font_regular,
+            text_color="#FFA500"
+        ).pack(pady=10)
+        
+        def on_choice(use_outer: bool):
+            selected_option["value"] = use_outer
+            dialog.destroy()
+        
+        button_frame = ctk.CTkFrame(dialog, fg_color="transparent")
+        button_frame.pack(pady=20)
+        
+        ctk.CTkButton(
+            button_frame,
+            text="📏 Использовать ширину ВНЕШНЕГО радиуса",
+            command=lambda: on_choice(True),
+            font=self.font_regular,
+            fg_color="#2B7A0B",
+            height=50,
+            width=400
+        ).pack(pady=5)
+        
+        ctk.CTkButton(
+            button_frame,
+            text="📏 Использовать ширину ВНУТРЕННЕГО радиуса",
+            command=lambda: on_choice(False),
+            font=self.font_regular,
+            fg_color="#1f538d",
+            height=50,
+            width=400
+        ).pack(pady=5)
+        
+        ctk.CTkButton(
+            button_frame,
+            text="Отмена",
+            command=dialog.destroy,
+            font=self.font_regular,
+            fg_color="gray30",
+            height=35,
+            width=400
+        ).pack(pady=5)
+        
+        self.wait_window(dialog)
+        return selected_option["value"]
+
+    def _align_widths_worker(self, folder_path: Path, anchor: str):
+        """Фоновая часть выравнивания ширины; окна сообщений показываются в потоке Tk"""
         try:
-            width_checks = self.base_analyzer.check_widths(folder_path, tolerance=0.1)
-            issues_found = sum(1 for check in width_checks if check.needs_adjustment)
+            # Сначала проверяем ширины
+            width_checks = self._get_width_checks(folder_path, tolerance=0.1)
+            # Выравнивать нужно только корпуса с расхождением — их и передаём дальше
+            width_checks = [check for check in width_checks if check.needs_adjustment]
+            issues_found = len(width_checks)
             
             if issues_found == 0:
-                messagebox.showinfo("Выравнивание не требуется", "Все ширины уже одинаковы!")
+                self.after(0, lambda: messagebox.showinfo("Выравнивание не требуется", "Все ширины уже одинаковы!"))
                 return
             
-            # Диалог выбора эталона
-            dialog = ctk.CTkToplevel(self)
-            dialog.title("Выбор эталонной ширины")
-            dialog.geometry("500x250")
-            dialog.transient(self)
-            dialog.grab_set()
-            
-            selected_option = {"value": None}
-            
-            ctk.CTkLabel(
-                dialog, 
-                text="Выберите эталонную ширину для выравнивания:",
-                font=self.font_title
-            ).pack(pady=20)
-            
-            ctk.CTkLabel(
-                dialog,
-                text=f"Обнаружено {issues_found} корпусов с расхождением ширины",
-                font=self.font_regular,
-                text_color="#FFA500"
-            ).pack(pady=10)
-            
-            def on_choice(use_outer: bool):
-                selected_option["value"] = use_outer
-                dialog.destroy()
-            
-            button_frame = ctk.CTkFrame(dialog, fg_color="transparent")
-            button_frame.pack(pady=20)
-            
-            ctk.CTkButton(
-                button_frame,
-                text="📏 Использовать ширину ВНЕШНЕГО радиуса",
-                command=lambda: on_choice(True),
-                font=self.font_regular,
-                fg_color="#2B7A0B",
-                height=50,
-                width=400
-            ).pack(pady=5)
-            
-            ctk.CTkButton(
-                button_frame,
-                text="📏 Использовать ширину ВНУТРЕННЕГО радиуса",
-                command=lambda: on_choice(False),
-                font=self.font_regular,
-                fg_color="#1f538d",
-                height=50,
-                width=400
-            ).pack(pady=5)
-            
-            ctk.CTkButton(
-                button_frame,
-                text="Отмена",
-                command=dialog.destroy,
-                font=self.font_regular,
-                fg_color="gray30",
-                height=35,
-                width=400
-            ).pack(pady=5)
-            
-            self.wait_window(dialog)
-            
-            if selected_option["value"] is None:
+            use_outer_width = self._call_in_ui(self._ask_width_reference, issues_found)
+            if use_outer_width is None:
                 return  # Пользователь отменил
             
-            use_outer_width = selected_option["value"]
-            
             # Выполняем выравнивание
             self._batch_log("")
-            self._batch_log(f"{'='*70}")
+            self._batch_log(_SEP)
             self._batch_log(f"ВЫРАВНИВАНИЕ ШИРИНЫ РАЗВЕРТОК")
-            self._batch_log(f"{'='*70}")
+            self._batch_log(_SEP)
             self._batch_log(f"Эталон: {'ВНЕШНИЙ радиус' if use_outer_width else 'ВНУТРЕННИЙ радиус'}")
             self._batch_log("")
             
-            anchor_map = {"Левый край": "start", "Центр": "center", "Правый край": "end"}
-            anchor = anchor_map.get(self.batch_anchor_var.get(), "start")
-            
-            results = self.base_analyzer.align_widths(folder_path, use_outer_width, anchor)
+            results = self.base_analyzer.align_widths(folder_path, use_outer_width, anchor,
+                                                      width_checks=width_checks)
             
             total_processed = sum(len(files) for files in results.values())
             
@@ -1039,30 +1487,32 @@ class FlatPatternApp(ctk.CTk):
                 self._batch_log("")
                 
                 for korpus_num, files in sorted(results.items()):
-                    self._batch_log(f"[{korpus_num.upper()}]")
-                    for file in files:
-                        self._batch_log(f"  ✅ {file.name}")
-                    self._batch_log("")
+                    self._batch_log_block([f"[{korpus_num.upper()}]", *(f"  ✅ {file.name}" for file in files), ""])
                 
-                self._batch_log(f"{'='*70}")
+                self._batch_log(_SEP)
                 self._batch_log("✅ ВЫРАВНИВАНИЕ ЗАВЕРШЕНО")
-                self._batch_log(f"{'='*70}")
+                self._batch_log(_SEP)
                 
-                messagebox.showinfo(
-                    "Выравнивание завершено",
+                summary = (
                     f"✅ Успешно выровнено!\n\n"
                     f"Обработано корпусов: {len(results)}\n"
                     f"Выровнено файлов: {total_processed}\n\n"
                     f"Эталон: {'ВНЕШНИЙ радиус' if use_outer_width else 'ВНУТРЕННИЙ радиус'}"
                 )
+                self.after(0, lambda: messagebox.showinfo("Выравнивание завершено", summary))
             else:
                 self._batch_log("⚠️  Нет файлов для обработки")
-                messagebox.showinfo("Выравнивание", "Нет файлов для обработки")
+                self.after(0, lambda: messagebox.showinfo("Выравнивание", "Нет файлов для обработки"))
             
+        except FileNotFoundError as exc:
+            self._batch_log(f"❌ ОШИБКА: {exc}")
+            message = str(exc)
+            self.after(0, lambda: messagebox.showerror("Ошибка", message))
         except Exception as exc:
             self._batch_log(f"❌ ОШИБКА: {exc}")
             logging.exception("Width alignment error")
-            messagebox.showerror("Ошибка выравнивания ширины", str(exc))
+            message = str(exc)
+            self.after(0, lambda: messagebox.showerror("Ошибка выравнивания ширины", message))
     
     def _generate_report(self):
         """Генерирует детальный текстовый отчёт о пакетной обработке"""
@@ -1070,106 +1520,124 @@ class FlatPatternApp(ctk.CTk):
             messagebox.showwarning("Нет данных", "Сначала выполните пакетную обработку.")
             return
 
+        if self._is_busy():
+            return
+
         folder = self.batch_folder_var.get().strip()
         if not folder:
             folder = str(Path.cwd())
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Снимок результатов: отчёт пишется в фоне, список может измениться
+        self._run_in_background(self._generate_report_worker, list(self.batch_results), folder)
+
+    def _generate_report_worker(self, results: List[StretchResult], folder: str):
+        """Фоновая часть генерации отчёта: подсчёт статистики и запись файла"""
+        now = datetime.now()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
         report_path = Path(folder) / f"ОТЧЁТ_ОБРАБОТКА_{timestamp}.txt"
 
+        # Все числа для отчёта считаются одним проходом по результатам
+        stats = np.fromiter(
+            ((r.current_length, r.target_length, r.scale) for r in results),
+            dtype=np.dtype([("cl", "f8"), ("tl", "f8"), ("sc", "f8")]),
+            count=len(results),
+        )
+        deltas = (stats["tl"] - stats["cl"]).tolist()
+        percents = ((stats["sc"] - 1) * 100).tolist()
+        elongated = int((stats["sc"] >= 1.0).sum())
+        shortened = len(stats) - elongated
+        avg_delta = float(np.abs(stats["tl"] - stats["cl"]).mean())
+
         try:
-            with open(report_path, "w", encoding="utf-8") as f:
-                f.write("="*80 + "\n")
-                f.write("      ОТЧЁТ: АВТОМАТИЧЕСКАЯ ПАКЕТНАЯ ОБРАБОТКА РАЗВЕРТОК\n")
-                f.write("="*80 + "\n")
-                f.write(f"Дата: {datetime.now().strftime('%d.%m.%Y %H:%M:%S')}\n")
-                f.write(f"Папка: {folder}\n")
-                f.write(f"Обработано файлов: {len(self.batch_results)}\n")
-                f.write("\n")
-                
-                # Информация об основаниях
-                if self.base_analyzer.bases:
-                    f.write("="*80 + "\n")
-                    f.write("ИСПОЛЬЗОВАННЫЕ ОСНОВАНИЯ\n")
-                    f.write("="*80 + "\n")
-                    for korpus_num, base in sorted(self.base_analyzer.bases.items()):
-                        f.write(f"\n[{korpus_num.upper()}] {base.file_path.name}\n")
-                        f.write(f"  Дуга 1 (внешняя):  R={base.arc1.radius:.3f} мм, L={base.arc1.arc_length:.3f} мм\n")
-                        f.write(f"  Дуга 2 (внутренняя): R={base.arc2.radius:.3f} мм, L={base.arc2.arc_length:.3f} мм\n")
-                        f.write(f"  Разница:          {base.arc1.arc_length - base.arc2.arc_length:.3f} мм\n")
-                    f.write("\n")
-
-                # Детали обработки каждого файла
-                f.write("="*80 + "\n")
-                f.write("РЕЗУЛЬТАТЫ ОБРАБОТКИ\n")
-                f.write("="*80 + "\n\n")
-
-                for i, result in enumerate(self.batch_results, 1):
-                    action = "УДЛИНЕНИЕ" if result.scale >= 1.0 else "УКОРОЧЕНИЕ"
-                    delta = result.target_length - result.current_length
-                    percent = (result.scale - 1) * 100
-                    
-                    f.write("-"*80 + "\n")
-                    f.write(f"ФАЙЛ {i}: {result.source_file.name}\n")
-                    f.write("-"*80 + "\n")
-                    
-                    # Определяем тип и корпус из имени файла
-                    filename = result.source_file.name
-                    try:
-                        korpus_match = re.search(r'корп(\d+)', filename, re.IGNORECASE)
-                        if korpus_match:
-                            korpus_num = f"корп{korpus_match.group(1)}"
-                            if korpus_num in self.base_analyzer.bases:
-                                base = self.base_analyzer.bases[korpus_num]
-                                is_outer = "Внешний" in filename or "внешний" in filename
-                                
-                                f.write(f"Тип:             {'Внешний радиус' if is_outer else 'Внутренний радиус'}\n")
-                                f.write(f"Корпус:          {korpus_num}\n")
-                                f.write(f"Основание:       {base.file_path.name}\n")
-                                
-                                if is_outer:
-                                    f.write(f"Эталон:          Дуга 1 (R={base.arc1.radius:.3f} мм)\n")
-                                else:
-                                    f.write(f"Эталон:          Дуга 2 (R={base.arc2.radius:.3f} мм)\n")
-                    except:
-                        pass
-                    
-                    f.write(f"Исходная длина:  {result.current_length:.3f} мм\n")
-                    f.write(f"Целевая длина:   {result.target_length:.3f} мм\n")
-                    f.write(f"{action}:        {delta:+.3f} мм ({percent:+.2f}%)\n")
-                    f.write(f"Направление:     {result.axis}\n")
-                    f.write(f"Коэффициент:     {result.scale:.6f}\n")
-                    f.write(f"Результат:       {result.stretched_dxf.name if result.stretched_dxf else '–'}\n")
-                    f.write("\n")
-
-                # Сводная статистика
-                f.write("="*80 + "\n")
-                f.write("СВОДНАЯ СТАТИСТИКА\n")
-                f.write("="*80 + "\n")
-                
-                elongated = sum(1 for r in self.batch_results if r.scale >= 1.0)
-                shortened = sum(1 for r in self.batch_results if r.scale < 1.0)
+            parts: List[str] = []
+            ap = parts.append
+            ap(_SEP_EQ)
+            ap("      ОТЧЁТ: АВТОМАТИЧЕСКАЯ ПАКЕТНАЯ ОБРАБОТКА РАЗВЕРТОК\n")
+            ap(_SEP_EQ)
+            ap(f"Дата: {now:%d.%m.%Y %H:%M:%S}\n")
+            ap(f"Папка: {folder}\n")
+            ap(f"Обработано файлов: {len(results)}\n")
+            ap("\n")
+            
+            # Информация об основаниях
+            if self.base_analyzer.bases:
+                ap(_SEP_EQ)
+                ap("ИСПОЛЬЗОВАННЫЕ ОСНОВАНИЯ\n")
+                ap(_SEP_EQ)
+                for korpus_num, base in sorted(self.base_analyzer.bases.items()):
+                    ap(f"\n[{korpus_num.upper()}] {base.file_path.name}\n")
+                    ap(f"  Дуга 1 (внешняя):  R={base.arc1.radius:.3f} мм, L={base.arc1.arc_length:.3f} мм\n")
+                    ap(f"  Дуга 2 (внутренняя): R={base.arc2.radius:.3f} мм, L={base.arc2.arc_length:.3f} мм\n")
+                    ap(f"  Разница:          {base.arc1.arc_length - base.arc2.arc_length:.3f} мм\n")
+                ap("\n")
+
+            # Детали обработки каждого файла
+            ap(_SEP_EQ)
+            ap("РЕЗУЛЬТАТЫ ОБРАБОТКИ\n")
+            ap(_SEP_EQ + "\n")
+
+            bases = self.base_analyzer.bases
+            # Тип и корпус каждого файла определяются по имени один раз
+            classified = [(result, *_classify_radius_file(result.source_file)) for result in results]
+            for i, (result, korpus_num, is_outer) in enumerate(classified, 1):
+                action = "УДЛИНЕНИЕ" if result.scale >= 1.0 else "УКОРОЧЕНИЕ"
+                delta = deltas[i - 1]
+                percent = percents[i - 1]
                 
-                f.write(f"Всего обработано:     {len(self.batch_results)}\n")
-                f.write(f"  - Удлинено:         {elongated}\n")
-                f.write(f"  - Укорочено:        {shortened}\n")
+                ap(f"{_SEP_DASH}ФАЙЛ {i}: {result.source_file.name}\n{_SEP_DASH}")
                 
-                avg_delta = sum(abs(r.target_length - r.current_length) for r in self.batch_results) / len(self.batch_results)
-                f.write(f"Средняя коррекция:    {avg_delta:.3f} мм\n")
+                base = bases.get(korpus_num) if korpus_num else None
+                if base is not None:
+                    ap(f"Тип:             {'Внешний радиус' if is_outer else 'Внутренний радиус'}\n")
+                    ap(f"Корпус:          {korpus_num}\n")
+                    ap(f"Основание:       {base.file_path.name}\n")
+                    
+                    if is_outer:
+                        ap(f"Эталон:          Дуга 1 (R={base.arc1.radius:.3f} мм)\n")
+                    else:
+                        ap(f"Эталон:          Дуга 2 (R={base.arc2.radius:.3f} мм)\n")
                 
-                f.write("\n")
-                f.write("="*80 + "\n")
-                f.write("                        КОНЕЦ ОТЧЁТА\n")
-                f.write("="*80 + "\n")
+                ap(
+                    f"Исходная длина:  {result.current_length:.3f} мм\n"
+                    f"Целевая длина:   {result.target_length:.3f} мм\n"
+                    f"{action}:        {delta:+.3f} мм ({percent:+.2f}%)\n"
+                    f"Направление:     {result.axis}\n"
+                    f"Коэффициент:     {result.scale:.6f}\n"
+                    f"Результат:       {result.stretched_dxf.name if result.stretched_dxf else '–'}\n"
+                    "\n"
+                )
+
+            # Сводная статистика
+            ap(_SEP_EQ)
+            ap("СВОДНАЯ СТАТИСТИКА\n")
+            ap(_SEP_EQ)
+            
+            ap(f"Всего обработано:     {len(results)}\n")
+            ap(f"  - Удлинено:         {elongated}\n")
+            ap(f"  - Укорочено:        {shortened}\n")
+            
+            ap(f"Средняя коррекция:    {avg_delta:.3f} мм\n")
+            
+            ap("\n")
+            ap(_SEP_EQ)
+            ap("                        КОНЕЦ ОТЧЁТА\n")
+            ap(_SEP_EQ)
+
+            # Части пишутся по очереди, без промежуточной строки со всем отчётом
+            with open(report_path, "w", encoding="utf-8") as f:
+                f.writelines(parts)
 
             self._batch_log(f"✅ Отчёт сохранён: {report_path.name}")
-            messagebox.showinfo("Отчёт создан", f"Детальный отчёт сохранён:\n{report_path}")
+            self.after(0, lambda: messagebox.showinfo("Отчёт создан", f"Детальный отчёт сохранён:\n{report_path}"))
 
         except Exception as exc:
             logging.exception("Report generation error")
-            messagebox.showerror("Ошибка", f"Не удалось создать отчёт: {exc}")
+            message = f"Не удалось создать отчёт: {exc}"
+            self.after(0, lambda: messagebox.showerror("Ошибка", message))
 
 
 if __name__ == "__main__":
+    # Нужно для пула процессов в собранном EXE (PyInstaller)
+    multiprocessing.freeze_support()
     app = FlatPatternApp()
     app.mainloop()
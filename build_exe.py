@@ -27,6 +27,10 @@ def build_exe():
         subprocess.check_call([sys.executable, "-m", "pip", "install", "pyinstaller"])
         print("[OK] PyInstaller установлен")
     
+    # Необязательный ускоритель пересчёта координат (если есть Cython и компилятор C)
+    from build_ext import build_ext as build_remap_ext
+    has_remap_ext = build_remap_ext()
+    
     # Параметры сборки
     app_name = "DXF_Stretcher"
     main_script = "app.py"
@@ -39,7 +43,7 @@ def build_exe():
     cmd = [
         "pyinstaller",
         "--name", app_name,
-        "--onefile",  # Один EXE файл
+        "--onedir",  # Папка с EXE: без распаковки во временную папку при каждом запуске
         "--windowed",  # Без консоли (GUI приложение)
         "--clean",
         # Добавляем данные
@@ -48,10 +52,11 @@ def build_exe():
         "--hidden-import", "customtkinter",
         "--hidden-import", "ezdxf",
         "--hidden-import", "PIL._tkinter_finder",
-        "--hidden-import", "numpy",  # Нужен для ezdxf.acc.matrix44
+        "--hidden-import", "numpy",  # Нужен ezdxf и векторным расчётам в core/ и отчёте
         # Исключаем ненужное для уменьшения размера
         "--exclude-module", "matplotlib",
         "--exclude-module", "pandas",
+        "--exclude-module", "scipy",
         main_script
     ]
     
@@ -59,6 +64,10 @@ def build_exe():
     if icon_file and Path(icon_file).exists():
         cmd.extend(["--icon", icon_file])
     
+    # Если ускоритель собран
+    if has_remap_ext:
+        cmd.extend(["--hidden-import", "core._remap_cy"])
+    
     print(f"\n[*] Запуск сборки...")
     print(f"    (это может занять 1-2 минуты)")
     
@@ -66,7 +75,7 @@ def build_exe():
         subprocess.check_call(cmd)
         
         # Проверяем результат
-        exe_file = Path("dist") / f"{app_name}.exe"
+        exe_file = Path("dist") / app_name / f"{app_name}.exe"
         
         if exe_file.exists():
             size_mb = exe_file.stat().st_size / (1024 * 1024)
@@ -78,12 +87,12 @@ def build_exe():
             print(f"    Размер: {size_mb:.1f} МБ")
             print(f"\n[!] МОЖНО ОТПРАВЛЯТЬ В ЦЕХ!")
             print(f"\n[i] Инструкция для цеха:")
-            print(f"    1. Скопируйте файл {app_name}.exe на компьютер")
-            print(f"    2. Запустите двойным кликом")
+            print(f"    1. Скопируйте папку {exe_file.parent.name} целиком на компьютер")
+            print(f"    2. Запустите {app_name}.exe двойным кликом")
             print(f"    3. Python НЕ ТРЕБУЕТСЯ!")
             print(f"\n[i] Что включено:")
-            print(f"    [+] DXF Stretcher GUI")
-            print(f"    [+] Все библиотеки (ezdxf, customtkinter)")
+            print(f"    [+] Папка с {app_name}.exe (DXF Stretcher GUI)")
+            print(f"    [+] Все библиотеки (ezdxf, customtkinter, numpy)")
             print(f"    [+] Модули обработки (core/)")
             print(f"    [+] Работает БЕЗ Python")
             print(f"    [+] Работает БЕЗ КОМПАС (с DXF файлами)")
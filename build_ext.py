@@ -0,0 +1,36 @@
+"""
+Сборка необязательного ускорителя core/_remap_cy.pyx (нужны Cython и компилятор C).
+
+Без него программа работает так же, пересчёт выполняется через numba или NumPy.
+"""
+import sys
+
+from setuptools import Extension, setup
+
+
+def build_ext() -> bool:
+    """Компилирует расширение на месте (рядом с core/_remap.py)"""
+    try:
+        from Cython.Build import cythonize
+    except ImportError:
+        print("[!] Cython не установлен, ускоритель не собран")
+        return False
+
+    # Без слияния умножения и сложения в FMA результат совпадает с NumPy до бита
+    compile_args = [] if sys.platform == "win32" else ["-O2", "-ffp-contract=off"]
+    extension = Extension("core._remap_cy", ["core/_remap_cy.pyx"], extra_compile_args=compile_args)
+    try:
+        setup(
+            name="dxfstretcher-remap",
+            ext_modules=cythonize([extension], quiet=True),
+            script_args=["build_ext", "--inplace"],
+        )
+    except SystemExit as e:
+        print(f"[!] Ошибка сборки ускорителя: {e}")
+        return False
+    print("[OK] Ускоритель core._remap_cy собран")
+    return True
+
+
+if __name__ == "__main__":
+    build_ext()
@@ -0,0 +1,117 @@
+"""
+Пересчёт массива координат по участкам отображения (ядро DxfProcessor._map_values)
+"""
+from __future__ import annotations
+
+import sys
+import threading
+
+import numpy as np
+
+# Опционально: компиляция ядра через numba (без него — тот же расчёт на NumPy)
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    njit = prange = None
+
+# Опционально: то же ядро, собранное Cython (python build_ext.py)
+try:
+    from ._remap_cy import remap_segments
+    CYTHON_AVAILABLE = True
+except ImportError:
+    CYTHON_AVAILABLE = False
+    remap_segments = None
+
+# С какого числа координат ядро numba запускается на всех ядрах процессора
+PARALLEL_THRESHOLD = 10_000
+
+# Разрешено ли многопоточное ядро в этом процессе (см. set_parallel)
+_parallel = True
+
+# Допуск попадания координаты на границу участка (как в DxfProcessor._map_value)
+_EPS = 1e-9
+
+
+def _remap_numpy(values: np.ndarray, starts: np.ndarray, ends: np.ndarray,
+                 scales: np.ndarray, offsets: np.ndarray, tail_offset: float) -> np.ndarray:
+    idx = np.searchsorted(ends, values, side="left")
+    inside = idx < len(ends)
+    idx = np.minimum(idx, len(ends) - 1)
+    inside &= values >= starts[idx] - _EPS
+
+    result = scales[idx] * values + offsets[idx]
+    return np.where(inside, result, values + tail_offset)
+
+
+if NUMBA_AVAILABLE:
+    # В собранном EXE папка пакета только для чтения — кэш компиляции не пишем
+    _CACHE = not getattr(sys, "frozen", False)
+
+    @njit(cache=_CACHE)
+    def _remap_one(value, starts, ends, scales, offsets, tail_offset):
+        # Участков обычно единицы, линейный проход быстрее двоичного поиска
+        for i in range(ends.shape[0]):
+            if value <= ends[i]:
+                if value >= starts[i] - _EPS:
+                    return scales[i] * value + offsets[i]
+                break
+        return value + tail_offset
+
+    @njit(cache=_CACHE)
+    def _remap_serial(values, starts, ends, scales, offsets, tail_offset):
+        result = np.empty_like(values)
+        for k in range(values.shape[0]):
+            result[k] = _remap_one(values[k], starts, ends, scales, offsets, tail_offset)
+        return result
+
+    @njit(cache=_CACHE, parallel=True)
+    def _remap_parallel(values, starts, ends, scales, offsets, tail_offset):
+        result = np.empty_like(values)
+        for k in prange(values.shape[0]):
+            result[k] = _remap_one(values[k], starts, ends, scales, offsets, tail_offset)
+        return result
+
+
+def set_parallel(enabled: bool) -> None:
+    """
+    Разрешает или запрещает многопоточное ядро numba в текущем процессе.
+
+    Выключается в рабочих процессах пула: файлы там и так обрабатываются
+    параллельно, а свой пул потоков numba в каждом процессе перегружает ядра.
+    """
+    global _parallel
+    _parallel = enabled
+
+
+def remap(values: np.ndarray, starts: np.ndarray, ends: np.ndarray,
+          scales: np.ndarray, offsets: np.ndarray, tail_offset: float) -> np.ndarray:
+    """
+    Отображает координаты по участкам: new = scale * old + offset.
+
+    Args:
+        values: Координаты (одномерный массив float64)
+        starts: Начала участков (не убывают)
+        ends: Концы участков с допуском (не убывают)
+        scales, offsets: Коэффициенты участков
+        tail_offset: Сдвиг для координат вне всех участков
+
+    Returns:
+        Новый массив координат
+    """
+    if not NUMBA_AVAILABLE:
+        if CYTHON_AVAILABLE:
+            values = np.ascontiguousarray(values, dtype=np.float64)
+            result = np.empty_like(values)
+            remap_segments(values, starts, ends, scales, offsets, float(tail_offset), result)
+            return result
+        return _remap_numpy(values, starts, ends, scales, offsets, tail_offset)
+
+    # Многопоточное ядро — только для одиночного файла в главном потоке: в пакетных
+    # потоках (batch_stretch) и процессах пула параллельность уже есть
+    parallel = (_parallel and len(values) > PARALLEL_THRESHOLD
+                and threading.current_thread() is threading.main_thread())
+    kernel = _remap_parallel if parallel else _remap_serial
+    return kernel(np.ascontiguousarray(values, dtype=np.float64), starts, ends, scales, offsets,
+                  float(tail_offset))
@@ -0,0 +1,31 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""
+Ядро пересчёта координат на Cython (тот же расчёт, что в _remap._remap_numpy)
+
+Сборка: python build_ext.py (нужны Cython и компилятор C)
+"""
+
+# Допуск попадания координаты на границу участка (как в DxfProcessor._map_value)
+cdef double _EPS = 1e-9
+
+
+def remap_segments(const double[::1] values, const double[::1] starts, const double[::1] ends,
+                   const double[::1] scales, const double[::1] offsets, double tail_offset,
+                   double[::1] out):
+    """Записывает в out координаты values, отображённые по участкам"""
+    cdef Py_ssize_t n = values.shape[0]
+    cdef Py_ssize_t n_segments = ends.shape[0]
+    cdef Py_ssize_t k, i
+    cdef double value, result
+
+    with nogil:
+        for k in range(n):
+            value = values[k]
+            result = value + tail_offset
+            # Участков обычно единицы, линейный проход быстрее двоичного поиска
+            for i in range(n_segments):
+                if value <= ends[i]:
+                    if value >= starts[i] - _EPS:
+                        result = scales[i] * value + offsets[i]
+                    break
+            out[k] = result
@@ -3,13 +3,135 @@
 """
 from __future__ import annotations
 
+import hashlib
+import json
 import math
+import os
 import re
-from dataclasses import dataclass
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor
+from dataclasses import dataclass, asdict
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import Iterator, List, Dict, NamedTuple, Optional, Tuple
 
 import ezdxf
+import numpy as np
+
+from .dxf_processor import DxfProcessor
+
+# Опционально: потоковое чтение модели без построения всего документа
+try:
+    from ezdxf.addons import iterdxf
+except ImportError:
+    iterdxf = None
+
+
+# Номер корпуса в имени файла: "...корп1..." или, если его нет, цифра после "Г"
+_KORPUS_RE = re.compile(r'корп(\d+)', re.IGNORECASE)
+_G_RE = re.compile(r'Г\d*\.?(\d+)', re.IGNORECASE)
+
+# Результаты анализа оснований между запусками программы
+CACHE_DIR = Path.home() / ".dxfstretcher" / "cache"
+# Версия формата кэша: при изменении анализа или формата старые файлы не используются
+CACHE_VERSION = 3
+
+
+# Виды DXF файлов в папке (DxfEntry.kind)
+ENTRY_BASE = "base"
+ENTRY_RADIUS = "radius"
+
+# Начала имён файлов радиусов (в нижнем регистре)
+_RADIUS_PREFIXES = ("внешний радиус", "внутренний радиус")
+
+
+class DxfEntry(NamedTuple):
+    """
+    DXF файл в папке (имя, полный путь и вид: ENTRY_BASE, ENTRY_RADIUS или "");
+    stat() всегда читает актуальные данные
+    """
+    name: str
+    path: str
+    kind: str = ""
+
+    def stat(self) -> os.stat_result:
+        return os.stat(self.path)
+
+
+def _is_processed_name(filename: str) -> bool:
+    """Результат растяжения (_stretch / _shrink)"""
+    stem = os.path.splitext(filename)[0]
+    return stem.endswith("_stretch") or stem.endswith("_shrink")
+
+
+def _classify_name(filename: str) -> str:
+    """Вид DXF файла по имени: основание, необработанный радиус или "" (прочие)"""
+    lower = filename.lower()
+    if lower.startswith("основание"):
+        return ENTRY_BASE
+    if lower.startswith(_RADIUS_PREFIXES) and not _is_processed_name(filename):
+        return ENTRY_RADIUS
+    return ""
+
+
+@lru_cache(maxsize=32)
+def _scan_dxf_names(folder: str, mtime_ns: int) -> Tuple[Tuple[str, str], ...]:
+    """
+    Имена и виды DXF файлов папки за один проход scandir. mtime_ns каталога входит
+    в ключ кэша: при добавлении, удалении или переименовании файла папка читается заново.
+    """
+    with os.scandir(folder) as it:
+        return tuple(
+            (entry.name, _classify_name(entry.name)) for entry in it
+            if entry.is_file(follow_symlinks=False) and entry.name.lower().endswith(".dxf")
+        )
+
+
+@lru_cache(maxsize=512)
+def _parse_korpus(filename: str) -> str:
+    """
+    Номер корпуса из имени файла ("корп1"); одно и то же имя разбирается один раз.
+
+    Raises:
+        ValueError: Если номер корпуса в имени не найден
+    """
+    # Ищем паттерн "корп" + цифра
+    match = _KORPUS_RE.search(filename)
+    if match:
+        return f"корп{match.group(1)}"
+
+    # Альтернативный паттерн: просто цифра после "Г"
+    match = _G_RE.search(filename)
+    if match:
+        return f"корп{match.group(1)}"
+
+    raise ValueError(f"Не удалось извлечь номер корпуса из имени: {filename}")
+
+
+@lru_cache(maxsize=512)
+def _is_outer(filename: str) -> bool:
+    """True для файла внешнего радиуса"""
+    return "Внешний" in filename or "внешний" in filename
+
+
+def _file_signature(st: os.stat_result) -> List[int]:
+    """Признак неизменности файла для кэша: время изменения в наносекундах и размер"""
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _measure_width(path: str) -> Tuple[Optional[float], Optional[float], Optional[str]]:
+    """
+    Измеряет ширину и длину развертки (выполняется в том числе в отдельном процессе).
+
+    Returns:
+        (ширина, длина по X, None) или (None, None, текст ошибки)
+    """
+    try:
+        info = DxfProcessor().load(path)
+        return info.width_y, info.length_x, None
+    except Exception as e:
+        return None, None, str(e)
 
 
 @dataclass
@@ -41,6 +163,118 @@ class BaseInfo:
         return self.arc2.arc_length
 
 
+def _arc_row(entity) -> Tuple[float, float, float, float, float]:
+    """Параметры дуги: (радиус, центр X, центр Y, начальный угол, конечный угол)"""
+    center = entity.dxf.center
+    return entity.dxf.radius, center.x, center.y, entity.dxf.start_angle, entity.dxf.end_angle
+
+
+def _arc_lengths(radii: np.ndarray, start_angles: np.ndarray, end_angles: np.ndarray) -> np.ndarray:
+    """Длины дуг по радиусам и углам в градусах (дуга идёт против часовой стрелки)"""
+    start_rad = np.radians(start_angles)
+    end_rad = np.radians(end_angles)
+    # Корректировка для случая когда end_angle < start_angle
+    end_rad = np.where(end_rad < start_rad, end_rad + 2 * math.pi, end_rad)
+    return radii * (end_rad - start_rad)
+
+
+def _arc_infos(rows: List[Tuple[float, float, float, float, float]]) -> List[ArcInfo]:
+    """ArcInfo для строк _arc_row; длины всех дуг считаются одной операцией"""
+    if not rows:
+        return []
+    radii, center_x, center_y, start_angles, end_angles = np.array(rows, dtype=np.float64).T
+    lengths = _arc_lengths(radii, start_angles, end_angles).tolist()
+    return [
+        ArcInfo(
+            radius=radius,
+            arc_length=arc_length,
+            center=(cx, cy),
+            start_angle=start_angle,
+            end_angle=end_angle
+        )
+        for (radius, cx, cy, start_angle, end_angle), arc_length in zip(rows, lengths)
+    ]
+
+
+def _extract_arc_info(entity) -> Optional[ArcInfo]:
+    """Извлекает информацию о дуге из DXF entity"""
+    try:
+        return _arc_infos([_arc_row(entity)])[0]
+    except Exception:
+        return None
+
+
+def _largest_arcs(entities) -> List[ArcInfo]:
+    """
+    Две дуги наибольшего радиуса (большая первая) за один проход, без сортировки.
+    Остальные дуги не разбираются дальше радиуса, ArcInfo строится только для пары;
+    при равных радиусах раньше идёт дуга, стоящая раньше в файле.
+    """
+    top = []
+    for entity in entities:
+        try:
+            radius = entity.dxf.radius
+            if len(top) == 2 and radius <= top[1][0]:
+                continue
+            row = _arc_row(entity)
+        except Exception:
+            continue
+        pos = 0 if top and radius > top[0][0] else min(len(top), 1)
+        top.insert(pos, row)
+        del top[2:]
+    return _arc_infos(top)
+
+
+def _read_arcs(file_path: Path) -> List[ArcInfo]:
+    """
+    Две наибольшие дуги модели файла. Нужны только ARC, поэтому файл читается потоком (iterdxf),
+    без таблиц, блоков и базы сущностей; если так прочитать нельзя
+    (например, двоичный DXF) — загружается весь документ.
+    """
+    if iterdxf is not None:
+        try:
+            return _largest_arcs(iterdxf.modelspace(str(file_path), types=["ARC"]))
+        except Exception:
+            pass
+    doc = ezdxf.readfile(str(file_path))
+    return _largest_arcs(entity for entity in doc.modelspace() if entity.dxftype() == "ARC")
+
+
+def _read_base_info(file_path: Path) -> BaseInfo:
+    """Анализирует один файл основания"""
+    # Извлекаем номер корпуса из имени
+    korpus_number = _parse_korpus(file_path.name)
+
+    # Читаем DXF и находим две наибольшие дуги
+    arcs = _read_arcs(file_path)
+
+    if len(arcs) < 2:
+        raise ValueError(f"Найдено менее 2 дуг в файле {file_path.name}. Требуется 2 основные дуги.")
+
+    # Две самые большие дуги (большая первая)
+    arc1, arc2 = arcs  # Внешняя (больший радиус) и внутренняя (меньший радиус)
+
+    return BaseInfo(
+        file_path=file_path,
+        korpus_number=korpus_number,
+        arc1=arc1,
+        arc2=arc2
+    )
+
+
+def _analyze_base(path: str) -> Tuple[Optional[BaseInfo], Optional[str]]:
+    """
+    Анализирует файл основания (выполняется в том числе в отдельном процессе).
+
+    Returns:
+        (BaseInfo, None) или (None, текст ошибки)
+    """
+    try:
+        return _read_base_info(Path(path)), None
+    except Exception as e:
+        return None, str(e)
+
+
 @dataclass
 class RadiusFileInfo:
     """Информация о файле радиуса"""
@@ -67,6 +301,8 @@ class WidthCheckResult:
     inner_width: Optional[float]
     width_difference: float
     needs_adjustment: bool
+    outer_length: Optional[float] = None  # Длина по X, измеренная вместе с шириной
+    inner_length: Optional[float] = None
     
     @property
     def has_both_files(self) -> bool:
@@ -83,99 +319,160 @@ class WidthCheckResult:
 
 class BaseAnalyzer:
     """Анализатор файлов оснований"""
+
+    # Анализ отдельных файлов оснований, общий для всех анализаторов процесса:
+    # (путь, mtime_ns, размер) -> BaseInfo. Ограничен по размеру (LRU)
+    _base_cache: "OrderedDict[Tuple[str, int, int], BaseInfo]" = OrderedDict()
+    _base_cache_size = 64
+    _base_cache_lock = threading.Lock()
     
     def __init__(self):
         self.bases: Dict[str, BaseInfo] = {}  # korpus_number -> BaseInfo
     
-    def analyze_folder(self, folder_path: Path) -> Dict[str, BaseInfo]:
+    def scan_entries(self, folder_path: Path) -> List[DxfEntry]:
+        """
+        Один проход по папке: возвращает все DXF файлы, уже разделённые по видам.
+        
+        Результат можно передать в analyze_folder, find_radius_files и check_widths,
+        чтобы не перечитывать папку для каждого из них. Пока папка не менялась
+        (время изменения каталога), список имён берётся из кэша.
+
+        Raises:
+            FileNotFoundError: Если папки нет или путь указывает не на папку
+        """
+        folder = os.path.abspath(folder_path)
+        try:
+            names = _scan_dxf_names(folder, os.stat(folder).st_mtime_ns)
+        except (FileNotFoundError, NotADirectoryError):
+            raise FileNotFoundError(f"Папка не найдена: {folder_path}") from None
+        return [DxfEntry(name, os.path.join(folder, name), kind) for name, kind in names]
+    
+    def analyze_folder(self, folder_path: Path,
+                       entries: Optional[List[DxfEntry]] = None,
+                       executor: Optional[Executor] = None) -> Dict[str, BaseInfo]:
         """
         Анализирует папку и находит все файлы оснований.
         
+        Args:
+            folder_path: Папка с файлами
+            entries: Результат scan_entries (если папка уже просканирована)
+            executor: Пул для параллельного анализа файлов (None — по очереди)
+        
         Returns:
             Dict[korpus_number, BaseInfo]
         """
         self.bases.clear()
         
+        if entries is None:
+            entries = self.scan_entries(folder_path)
+        
         # Ищем все файлы оснований
-        base_files = list(folder_path.glob("Основание*.dxf")) + list(folder_path.glob("Основание*.DXF"))
+        base_entries = [entry for entry in entries if entry.kind == ENTRY_BASE]
+        base_files = [Path(entry.path) for entry in base_entries]
         
         if not base_files:
             raise FileNotFoundError(f"Не найдено файлов оснований в папке: {folder_path}")
+
+        # Результат зависит только от файлов оснований: если ни один не менялся,
+        # берём анализ с диска
+        signature = {entry.name: _file_signature(entry.stat()) for entry in base_entries}
+        cached = self._load_cache(folder_path, signature)
+        if cached is not None:
+            self.bases.update(cached)
+            return self.bases
+        
+        # Файлы оснований независимы — в пуле процессов они разбираются параллельно
+        if executor is not None and len(base_files) > 1:
+            analyzed = executor.map(_analyze_base, [str(path) for path in base_files])
+        else:
+            analyzed = map(_analyze_base, [str(path) for path in base_files])
         
-        for base_file in base_files:
-            try:
-                base_info = self._analyze_base_file(base_file)
-                self.bases[base_info.korpus_number] = base_info
-            except Exception as e:
-                print(f"[!] Ошибка при анализе {base_file.name}: {e}")
+        failed = False
+        for base_file, (base_info, error) in zip(base_files, analyzed):
+            if error:
+                print(f"[!] Ошибка при анализе {base_file.name}: {error}")
+                failed = True
                 continue
+            self.bases[base_info.korpus_number] = base_info
         
         if not self.bases:
             raise RuntimeError("Не удалось проанализировать ни одного файла основания")
-        
+
+        # С ошибкой (например, файл занят КОМПАС при сохранении) результат неполный:
+        # на диск не пишем, чтобы в следующий раз такой файл разобрался заново
+        if not failed:
+            self._save_cache(folder_path, signature)
         return self.bases
+
+    def _cache_path(self, folder_path: Path) -> Path:
+        """Файл кэша анализа для папки"""
+        digest = hashlib.sha1(str(Path(folder_path).resolve()).encode("utf-8")).hexdigest()
+        return CACHE_DIR / f"{digest}.json"
+
+    def _load_cache(self, folder_path: Path, signature: Dict[str, List[int]]) -> Optional[Dict[str, BaseInfo]]:
+        """Возвращает сохранённый анализ, если файлы оснований не менялись"""
+        try:
+            with open(self._cache_path(folder_path), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != CACHE_VERSION or data.get("signature") != signature:
+                return None
+            bases = {}
+            for item in data["bases"]:
+                base_info = BaseInfo(
+                    file_path=Path(item["file_path"]),
+                    korpus_number=item["korpus_number"],
+                    arc1=ArcInfo(**{**item["arc1"], "center": tuple(item["arc1"]["center"])}),
+                    arc2=ArcInfo(**{**item["arc2"], "center": tuple(item["arc2"]["center"])}),
+                )
+                bases[base_info.korpus_number] = base_info
+            return bases
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            # Нет кэша или он повреждён — анализируем заново
+            return None
+
+    def _save_cache(self, folder_path: Path, signature: Dict[str, List[int]]):
+        """Сохраняет анализ оснований; ошибки записи не мешают работе"""
+        data = {
+            "version": CACHE_VERSION,
+            "signature": signature,
+            "bases": [{**asdict(base), "file_path": str(base.file_path)} for base in self.bases.values()],
+        }
+        cache_path = self._cache_path(folder_path)
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"[!] Не удалось сохранить кэш анализа: {e}")
     
+    def get_base_info(self, file_path: Path) -> BaseInfo:
+        """
+        Анализ одного файла основания; неизменённый файл повторно не читается
+        (например, когда по одному основанию обрабатывается несколько радиусов)
+        """
+        st = os.stat(file_path)
+        key = (os.path.abspath(file_path), st.st_mtime_ns, st.st_size)
+        with self._base_cache_lock:
+            base_info = self._base_cache.get(key)
+            if base_info is not None:
+                self._base_cache.move_to_end(key)
+        if base_info is None:
+            base_info = self._analyze_base_file(Path(file_path))
+            with self._base_cache_lock:
+                self._base_cache[key] = base_info
+                if len(self._base_cache) > self._base_cache_size:
+                    self._base_cache.popitem(last=False)
+        return base_info
+
     def _analyze_base_file(self, file_path: Path) -> BaseInfo:
         """Анализирует один файл основания"""
-        # Извлекаем номер корпуса из имени
-        korpus_number = self._extract_korpus_number(file_path.name)
-        
-        # Читаем DXF и находим дуги
-        doc = ezdxf.readfile(str(file_path))
-        msp = doc.modelspace()
-        
-        arcs = []
-        for entity in msp:
-            if entity.dxftype() == "ARC":
-                arc_info = self._extract_arc_info(entity)
-                if arc_info:
-                    arcs.append(arc_info)
-        
-        if len(arcs) < 2:
-            raise ValueError(f"Найдено менее 2 дуг в файле {file_path.name}. Требуется 2 основные дуги.")
-        
-        # Сортируем дуги по радиусу (большая первая)
-        arcs.sort(key=lambda a: a.radius, reverse=True)
-        
-        # Берём 2 самые большие дуги
-        arc1 = arcs[0]  # Внешняя (больший радиус)
-        arc2 = arcs[1]  # Внутренняя (меньший радиус)
-        
-        return BaseInfo(
-            file_path=file_path,
-            korpus_number=korpus_number,
-            arc1=arc1,
-            arc2=arc2
-        )
+        return _read_base_info(file_path)
     
     def _extract_arc_info(self, entity) -> Optional[ArcInfo]:
         """Извлекает информацию о дуге из DXF entity"""
-        try:
-            radius = entity.dxf.radius
-            center = (entity.dxf.center.x, entity.dxf.center.y)
-            start_angle = entity.dxf.start_angle
-            end_angle = entity.dxf.end_angle
-            
-            # Вычисляем длину дуги
-            start_rad = math.radians(start_angle)
-            end_rad = math.radians(end_angle)
-            
-            # Корректировка для случая когда end_angle < start_angle
-            if end_rad < start_rad:
-                end_rad += 2 * math.pi
-            
-            angle_diff = end_rad - start_rad
-            arc_length = radius * angle_diff
-            
-            return ArcInfo(
-                radius=radius,
-                arc_length=arc_length,
-                center=center,
-                start_angle=start_angle,
-                end_angle=end_angle
-            )
-        except Exception:
-            return None
+        return _extract_arc_info(entity)
     
     def _extract_korpus_number(self, filename: str) -> str:
         """
@@ -185,32 +482,30 @@ class BaseAnalyzer:
         - "Основание Г1.корп1 - 1шт.DXF" -> "корп1"
         - "Основание Г1.корп2 - 1шт.dxf" -> "корп2"
         """
-        # Ищем паттерн "корп" + цифра
-        match = re.search(r'корп(\d+)', filename, re.IGNORECASE)
-        if match:
-            return f"корп{match.group(1)}"
-        
-        # Альтернативный паттерн: просто цифра после "Г"
-        match = re.search(r'Г\d*\.?(\d+)', filename, re.IGNORECASE)
-        if match:
-            return f"корп{match.group(1)}"
-        
-        raise ValueError(f"Не удалось извлечь номер корпуса из имени: {filename}")
+        return _parse_korpus(filename)
     
-    def find_radius_files(self, folder_path: Path) -> List[Path]:
-        """Находит все файлы радиусов в папке"""
-        radius_files = []
-        
-        # Ищем внешние и внутренние радиусы
-        patterns = ["Внешний радиус*.dxf", "Внутренний радиус*.dxf"]
-        
-        for pattern in patterns:
-            files = list(folder_path.glob(pattern))
-            # Исключаем уже обработанные файлы
-            files = [f for f in files if not f.stem.endswith("_stretch") and not f.stem.endswith("_shrink")]
-            radius_files.extend(files)
+    def iter_radius_files(self, folder_path: Path,
+                          entries: Optional[List[DxfEntry]] = None) -> Iterator[Path]:
+        """
+        Перебирает файлы радиусов в папке в порядке каталога, без промежуточного списка.
+        """
+        if entries is None:
+            entries = self.scan_entries(folder_path)
         
-        return sorted(radius_files, key=lambda x: x.name)
+        # Внешние и внутренние радиусы (кроме уже обработанных) размечены при сканировании
+        for entry in entries:
+            if entry.kind == ENTRY_RADIUS:
+                yield Path(entry.path)
+    
+    def find_radius_files(self, folder_path: Path,
+                          entries: Optional[List[DxfEntry]] = None) -> List[Path]:
+        """Находит все файлы радиусов в папке (entries — результат scan_entries)"""
+        return sorted(self.iter_radius_files(folder_path, entries), key=lambda x: x.name)
+    
+    @staticmethod
+    def _is_processed(filename: str) -> bool:
+        """Исключаем уже обработанные файлы"""
+        return _is_processed_name(filename)
     
     def match_radius_to_base(self, radius_file: Path, current_length: float) -> RadiusFileInfo:
         """
@@ -226,7 +521,7 @@ class BaseAnalyzer:
         filename = radius_file.name
         
         # Определяем тип радиуса
-        is_outer = "Внешний" in filename or "внешний" in filename
+        is_outer = _is_outer(filename)
         
         # Извлекаем номер корпуса
         korpus_number = self._extract_korpus_number(filename)
@@ -256,31 +551,54 @@ class BaseAnalyzer:
             base_info=base_info
         )
     
-    def check_widths(self, folder_path: Path, tolerance: float = 0.1) -> List[WidthCheckResult]:
+    def check_widths(self, folder_path: Path, tolerance: float = 0.1,
+                     entries: Optional[List[DxfEntry]] = None,
+                     executor: Optional[Executor] = None) -> List[WidthCheckResult]:
         """
         Проверяет ширину разверток внутренних и внешних радиусов для каждого корпуса.
         
         Args:
             folder_path: Папка с файлами разверток
             tolerance: Допустимое отклонение ширины в мм (по умолчанию 0.1 мм)
+            entries: Результат scan_entries (если папка уже просканирована)
+            executor: Пул для параллельного измерения файлов (None — по очереди)
             
         Returns:
             Список результатов проверки для каждого корпуса
         """
-        from .dxf_processor import DxfProcessor
-        
         results = []
-        dxf_proc = DxfProcessor()
+        korpus_files = self._group_radius_files(folder_path, entries)
+        
+        # Измеряем все файлы сразу (в пуле процессов, если он передан)
+        flat_files = [
+            file_path
+            for korpus_num in sorted(korpus_files.keys())
+            for file_path in (korpus_files[korpus_num].get("outer"), korpus_files[korpus_num].get("inner"))
+            if file_path is not None
+        ]
+        if executor is not None:
+            measured = dict(zip(flat_files, executor.map(_measure_width, [str(path) for path in flat_files])))
+        else:
+            measured = {file_path: _measure_width(str(file_path)) for file_path in flat_files}
         
-        # Находим все файлы радиусов
-        radius_files = self.find_radius_files(folder_path)
+        # Проверяем каждый корпус
+        for korpus_num in sorted(korpus_files.keys()):
+            try:
+                results.append(self._width_check(korpus_num, korpus_files[korpus_num], measured, tolerance))
+            except Exception as e:
+                print(f"[!] Ошибка при проверке ширины для {korpus_num}: {e}")
+                continue
         
-        # Группируем по корпусам
+        return results
+    
+    def _group_radius_files(self, folder_path: Path,
+                            entries: Optional[List[DxfEntry]] = None) -> Dict[str, Dict[str, Path]]:
+        """Файлы радиусов по корпусам: {korpus_number: {"outer": путь, "inner": путь}}"""
         korpus_files: Dict[str, Dict[str, Path]] = {}
-        for file_path in radius_files:
+        for file_path in self.find_radius_files(folder_path, entries):
             try:
                 korpus_num = self._extract_korpus_number(file_path.name)
-                is_outer = "Внешний" in file_path.name or "внешний" in file_path.name
+                is_outer = _is_outer(file_path.name)
                 
                 if korpus_num not in korpus_files:
                     korpus_files[korpus_num] = {}
@@ -288,110 +606,148 @@ class BaseAnalyzer:
                 korpus_files[korpus_num]["outer" if is_outer else "inner"] = file_path
             except Exception:
                 continue
-        
-        # Проверяем каждый корпус
-        for korpus_num in sorted(korpus_files.keys()):
-            files = korpus_files[korpus_num]
-            outer_file = files.get("outer")
-            inner_file = files.get("inner")
-            
-            outer_width = None
-            inner_width = None
-            
-            try:
-                if outer_file:
-                    info = dxf_proc.load(str(outer_file))
-                    outer_width = info.width_y
-                
-                if inner_file:
-                    info = dxf_proc.load(str(inner_file))
-                    inner_width = info.width_y
-                
-                # Вычисляем разницу
-                if outer_width is not None and inner_width is not None:
-                    width_diff = outer_width - inner_width
-                    needs_adjustment = abs(width_diff) > tolerance
-                else:
-                    width_diff = 0.0
-                    needs_adjustment = False
-                
-                result = WidthCheckResult(
-                    korpus_number=korpus_num,
-                    outer_file=outer_file,
-                    inner_file=inner_file,
-                    outer_width=outer_width,
-                    inner_width=inner_width,
-                    width_difference=width_diff,
-                    needs_adjustment=needs_adjustment
-                )
-                results.append(result)
-                
-            except Exception as e:
-                print(f"[!] Ошибка при проверке ширины для {korpus_num}: {e}")
-                continue
-        
-        return results
+        return korpus_files
+    
+    def _width_check(self, korpus_num: str, files: Dict[str, Path],
+                     measured: Dict[Path, Tuple[Optional[float], Optional[float], Optional[str]]],
+                     tolerance: float) -> WidthCheckResult:
+        """Результат проверки корпуса по измерениям его файлов (ошибка измерения — исключение)"""
+        outer_file = files.get("outer")
+        inner_file = files.get("inner")
+        
+        outer_width = None
+        inner_width = None
+        outer_length = None
+        inner_length = None
+        
+        if outer_file:
+            outer_width, outer_length, error = measured[outer_file]
+            if error:
+                raise RuntimeError(error)
+        
+        if inner_file:
+            inner_width, inner_length, error = measured[inner_file]
+            if error:
+                raise RuntimeError(error)
+        
+        # Вычисляем разницу
+        if outer_width is not None and inner_width is not None:
+            width_diff = outer_width - inner_width
+            needs_adjustment = abs(width_diff) > tolerance
+        else:
+            width_diff = 0.0
+            needs_adjustment = False
+        
+        return WidthCheckResult(
+            korpus_number=korpus_num,
+            outer_file=outer_file,
+            inner_file=inner_file,
+            outer_width=outer_width,
+            inner_width=inner_width,
+            width_difference=width_diff,
+            needs_adjustment=needs_adjustment,
+            outer_length=outer_length,
+            inner_length=inner_length
+        )
     
     def align_widths(self, folder_path: Path, use_outer_width: bool = True, 
-                     anchor: str = "start") -> Dict[str, List[Path]]:
+                     anchor: str = "start",
+                     width_checks: Optional[List[WidthCheckResult]] = None) -> Dict[str, List[Path]]:
         """
         Выравнивает ширину разверток (ось Y) для всех корпусов.
         
+        Без готовой проверки корпуса проверяются по одному, и файл, который нужно
+        выровнять, растягивается тем же DxfProcessor, что его измерил (без повторного
+        чтения). В памяти одновременно не больше одного такого документа.
+        
         Args:
             folder_path: Папка с файлами разверток
             use_outer_width: Если True, использует ширину внешнего радиуса как эталон
                            Если False, использует ширину внутреннего радиуса
             anchor: Точка привязки для масштабирования ("start", "center", "end")
+            width_checks: Уже выполненная проверка ширины (иначе проверяется здесь)
             
         Returns:
             Словарь {korpus_number: [список_обработанных_файлов]}
         """
-        from .dxf_processor import DxfProcessor
-        
-        dxf_proc = DxfProcessor()
         results: Dict[str, List[Path]] = {}
         
-        # Проверяем ширины
-        width_checks = self.check_widths(folder_path, tolerance=0.1)
+        if width_checks is not None:
+            for check in width_checks:
+                output_file = self._align_one(check, use_outer_width, anchor)
+                if output_file is not None:
+                    results[check.korpus_number] = [output_file]
+            return results
         
-        for check in width_checks:
-            if not check.has_both_files or not check.needs_adjustment:
-                continue
-            
-            korpus_files = []
-            
-            # Определяем эталонную ширину и файл, который нужно обработать
-            if use_outer_width:
-                target_width = check.outer_width
-                file_to_process = check.inner_file
-                current_width = check.inner_width
-            else:
-                target_width = check.inner_width
-                file_to_process = check.outer_file
-                current_width = check.outer_width
-            
-            if file_to_process and target_width and current_width:
+        # Выравнивается файл, чья ширина не эталонная
+        side_to_process = "inner" if use_outer_width else "outer"
+        korpus_files = self._group_radius_files(folder_path)
+        for korpus_num in sorted(korpus_files.keys()):
+            files = korpus_files[korpus_num]
+            measured = {}
+            kept: Optional[DxfProcessor] = None
+            for side in ("outer", "inner"):
+                file_path = files.get(side)
+                if file_path is None:
+                    continue
+                if side != side_to_process or len(files) < 2:
+                    measured[file_path] = _measure_width(str(file_path))
+                    continue
+                dxf_proc = DxfProcessor()
                 try:
-                    # Загружаем файл
-                    dxf_proc.load(str(file_to_process))
-                    
-                    # Выполняем растяжение по оси Y
-                    output_file = dxf_proc.stretch(
-                        target_length=target_width,
-                        axis="Y",
-                        anchor=anchor
-                    )
-                    korpus_files.append(output_file)
-                    
+                    info = dxf_proc.load(str(file_path))
                 except Exception as e:
-                    print(f"[!] Ошибка при выравнивании ширины {file_to_process.name}: {e}")
+                    measured[file_path] = (None, None, str(e))
                     continue
-            
-            if korpus_files:
-                results[check.korpus_number] = korpus_files
+                measured[file_path] = (info.width_y, info.length_x, None)
+                kept = dxf_proc
+            try:
+                check = self._width_check(korpus_num, files, measured, 0.1)
+            except Exception as e:
+                print(f"[!] Ошибка при проверке ширины для {korpus_num}: {e}")
+                continue
+            output_file = self._align_one(check, use_outer_width, anchor, kept)
+            if output_file is not None:
+                results[korpus_num] = [output_file]
         
         return results
     
+    def _align_one(self, check: WidthCheckResult, use_outer_width: bool, anchor: str,
+                   dxf_proc: Optional[DxfProcessor] = None) -> Optional[Path]:
+        """
+        Выравнивает ширину одного корпуса; None — если выравнивать нечего или не удалось.
+        dxf_proc — процессор, в который уже загружен выравниваемый файл.
+        """
+        if not check.has_both_files or not check.needs_adjustment:
+            return None
+        
+        # Определяем эталонную ширину и файл, который нужно обработать
+        if use_outer_width:
+            target_width = check.outer_width
+            file_to_process = check.inner_file
+            current_width = check.inner_width
+        else:
+            target_width = check.inner_width
+            file_to_process = check.outer_file
+            current_width = check.outer_width
+        
+        if not (file_to_process and target_width and current_width):
+            return None
+        try:
+            if dxf_proc is None:
+                dxf_proc = DxfProcessor()
+                dxf_proc.load(str(file_to_process))
+            
+            # Выполняем растяжение по оси Y
+            return dxf_proc.stretch(
+                target_length=target_width,
+                axis="Y",
+                anchor=anchor
+            )
+        except Exception as e:
+            print(f"[!] Ошибка при выравнивании ширины {file_to_process.name}: {e}")
+            return None
+    
     def get_summary(self) -> str:
         """Возвращает сводку по найденным основаниям"""
         if not self.bases:
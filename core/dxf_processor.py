@@ -3,16 +3,28 @@
 """
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+import io
+import math
+from bisect import bisect_left
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
 
 import ezdxf
-from ezdxf.math import Matrix44
+import numpy as np
+from ezdxf.math import BoundingBox, Matrix44, Vec3, Z_AXIS
 from ezdxf import bbox
+from ezdxf.document import Drawing
+from ezdxf.filemanagement import dxf_stream_info
+from ezdxf.lldxf.tagger import binary_tags_loader
 
+from ._remap import remap
 
-@dataclass
+# Номер координаты для оси
+_AXIS_INDEX = {"X": 0, "Y": 1}
+
+
+@dataclass(frozen=True)
 class DxfInfo:
     source_path: Path
     length_x: float
@@ -24,6 +36,123 @@ class DxfInfo:
     max_y: float
 
 
+def _swept(angle: float, start: float, span: float, period: float) -> bool:
+    """Попадает ли угол в дугу от start длиной span (против часовой стрелки)"""
+    return (angle - start) % period <= span
+
+
+def _arc_interval(entity, axis_index: int) -> tuple:
+    """Проекция окружности или дуги на ось X (0) или Y (1)"""
+    center = entity.dxf.center
+    radius = abs(entity.dxf.radius)
+    c = center[axis_index]
+    if entity.dxftype() == "CIRCLE":
+        return c - radius, c + radius
+
+    start = entity.dxf.start_angle % 360.0
+    span = (entity.dxf.end_angle - entity.dxf.start_angle) % 360.0 or 360.0
+    trig = math.cos if axis_index == 0 else math.sin
+    values = [c + radius * trig(math.radians(start)), c + radius * trig(math.radians(start + span))]
+    # Крайние точки окружности по оси: 0° и 180° для X, 90° и 270° для Y
+    for angle in ((0.0, 180.0) if axis_index == 0 else (90.0, 270.0)):
+        if _swept(angle, start, span, 360.0):
+            values.append(c + radius * trig(math.radians(angle)))
+    return min(values), max(values)
+
+
+def _ellipse_interval(entity, axis_index: int) -> tuple:
+    """Проекция эллипса (или его дуги) в плоскости XY на ось X (0) или Y (1)"""
+    c = entity.dxf.center[axis_index]
+    major = Vec3(entity.dxf.major_axis)
+    minor = Z_AXIS.cross(major).normalize(major.magnitude * entity.dxf.ratio)
+    a, b = major[axis_index], minor[axis_index]
+
+    def at(t: float) -> float:
+        return c + a * math.cos(t) + b * math.sin(t)
+
+    start = entity.dxf.start_param % math.tau
+    span = (entity.dxf.end_param - entity.dxf.start_param) % math.tau
+    if span < 1e-12:
+        span = math.tau
+    values = [at(start), at(start + span)]
+    # Экстремумы a·cos t + b·sin t: t = atan2(b, a) и t + π
+    extreme = math.atan2(b, a)
+    for t in (extreme, extreme + math.pi):
+        if _swept(t, start, span, math.tau):
+            values.append(at(t))
+    return min(values), max(values)
+
+
+# Значения $EXTMIN/$EXTMAX по умолчанию (габарит не записан)
+_HEADER_EXTENTS_LIMIT = 1e19
+
+
+def read_header_extents(path) -> Optional[BoundingBox]:
+    """
+    Габарит из $EXTMIN/$EXTMAX заголовка текстового DXF без разбора модели.
+
+    Читается только секция HEADER. None — если файл двоичный, значений нет
+    или они не похожи на настоящий габарит (значения по умолчанию, пустой габарит).
+    """
+    wanted = {"$EXTMIN": None, "$EXTMAX": None}
+    try:
+        with open(path, "rt", encoding="cp1252", errors="ignore") as fp:
+            def pairs():
+                while True:
+                    code, value = fp.readline(), fp.readline()
+                    if not value:
+                        return
+                    code = code.strip()
+                    if code != "999":
+                        yield code, value.strip()
+
+            tags = pairs()
+            # Файл должен начинаться с секции HEADER
+            if next(tags, None) != ("0", "SECTION") or next(tags, None) != ("2", "HEADER"):
+                return None
+            current = None
+            for code, value in tags:
+                if code == "0":
+                    break
+                if code == "9":
+                    current = value if value in wanted else None
+                    if current is not None:
+                        wanted[current] = {}
+                elif current is not None and code in ("10", "20", "30"):
+                    wanted[current][code] = float(value)
+    except (OSError, ValueError):
+        return None
+
+    extmin, extmax = wanted["$EXTMIN"], wanted["$EXTMAX"]
+    if not extmin or not extmax or "10" not in extmin or "20" not in extmin \
+            or "10" not in extmax or "20" not in extmax:
+        return None
+    low = (extmin["10"], extmin["20"], extmin.get("30", 0.0))
+    high = (extmax["10"], extmax["20"], extmax.get("30", 0.0))
+    if any(abs(v) >= _HEADER_EXTENTS_LIMIT for v in low + high):
+        return None
+    if high[0] <= low[0] or high[1] < low[1]:
+        return None
+    return BoundingBox([low, high])
+
+
+def _vertex_values(points) -> Optional[np.ndarray]:
+    """Собственный массив (N, 3) точек VertexArray или None для других контейнеров"""
+    values = getattr(points, "values", None)
+    if isinstance(values, np.ndarray) and values.dtype == np.float64 and values.ndim == 2 \
+            and values.shape[1] == 3:
+        return values
+    return None
+
+
+def _spline_points(points) -> np.ndarray:
+    """Точки сплайна как (N, 3): массив самого VertexArray, если он доступен, иначе копия"""
+    values = _vertex_values(points)
+    if values is not None:
+        return values
+    return np.array(list(points), dtype=np.float64).reshape(-1, 3)
+
+
 class DxfProcessor:
     """Измерение и масштабирование DXF"""
 
@@ -32,11 +161,35 @@ class DxfProcessor:
         self.last_path: Optional[Path] = None
         self.extents: Optional[bbox.Extents] = None
         self.zone_cache = {}
+        # Концы участков отображений текущего растяжения (очищаются после него):
+        # id(отображение) -> (отображение, концы)
+        self._mapping_ends: Dict[int, Tuple[list, List[float]]] = {}
 
     # ------------------------------------------------------------------ #
     def load(self, path: str) -> DxfInfo:
+        doc = ezdxf.readfile(str(path))
+        return self._set_document(doc, path)
+
+    def load_bytes(self, data: bytes, path: str) -> DxfInfo:
+        """
+        Загружает DXF из уже прочитанных байтов (ASCII или двоичный DXF).
+
+        path используется только как имя документа и для имени результата
+        растяжения — с диска файл повторно не читается.
+        """
+        if data.startswith(b"AutoCAD Binary DXF"):
+            doc = Drawing.load(binary_tags_loader(data))
+        else:
+            # Как в ezdxf.readfile: кодировку берём из заголовка, сам заголовок — ASCII
+            data = data.replace(b"\r\n", b"\n")
+            info = dxf_stream_info(io.StringIO(data.decode("utf-8", errors="ignore")))
+            doc = ezdxf.read(io.StringIO(data.decode(info.encoding, errors="surrogateescape")))
+        doc.filename = str(path)
+        return self._set_document(doc, path)
+
+    def _set_document(self, doc: Drawing, path: str) -> DxfInfo:
         self.last_path = Path(path)
-        self.last_doc = ezdxf.readfile(str(self.last_path))
+        self.last_doc = doc
         msp = self.last_doc.modelspace()
         extents = bbox.extents(msp)
         if extents is None:
@@ -80,8 +233,10 @@ class DxfProcessor:
 
         zones = self._get_zones(axis)
         mapping = self._build_mapping(zones, axis, target_length)
+        mapping = self._anchored_mapping(mapping, axis, anchor)
         self._apply_mapping(mapping, axis)
-        self._apply_anchor_shift(mapping, axis, anchor)
+        self._update_extents({axis: mapping})
+        self._mapping_ends.clear()
 
         output_path = Path(save_path) if save_path else self.last_path.with_name(
             f"{self.last_path.stem}_stretch.dxf"
@@ -118,22 +273,19 @@ class DxfProcessor:
         if not needs_x_stretch and not needs_y_stretch:
             return self.last_path
         
-        # Обрабатываем ось X
+        # Зоны и границы по Y не зависят от растяжения по X (и наоборот),
+        # поэтому отображения обеих осей (уже со сдвигом привязки) строятся
+        # по исходной модели и применяются за один обход modelspace
+        mappings = {}
         if needs_x_stretch:
-            zones_x = self._get_zones("X")
-            mapping_x = self._build_mapping(zones_x, "X", target_length_x)
-            self._apply_mapping(mapping_x, "X")
-            self._apply_anchor_shift(mapping_x, "X", anchor_x)
-            # Обновляем extents после изменения
-            msp = self.last_doc.modelspace()
-            self.extents = bbox.extents(msp)
-        
-        # Обрабатываем ось Y
+            mapping_x = self._build_mapping(self._get_zones("X"), "X", target_length_x)
+            mappings["X"] = self._anchored_mapping(mapping_x, "X", anchor_x)
         if needs_y_stretch:
-            zones_y = self._get_zones("Y")
-            mapping_y = self._build_mapping(zones_y, "Y", target_width_y)
-            self._apply_mapping(mapping_y, "Y")
-            self._apply_anchor_shift(mapping_y, "Y", anchor_y)
+            mapping_y = self._build_mapping(self._get_zones("Y"), "Y", target_width_y)
+            mappings["Y"] = self._anchored_mapping(mapping_y, "Y", anchor_y)
+        self._apply_mappings(mappings)
+        self._update_extents(mappings)
+        self._mapping_ends.clear()
         
         # Сохраняем результат
         output_path = Path(save_path) if save_path else self.last_path.with_name(
@@ -142,6 +294,23 @@ class DxfProcessor:
         self.last_doc.saveas(output_path)
         return output_path
 
+    def _update_extents(self, mappings: Dict[str, List["DxfProcessor.MappingSegment"]]):
+        """
+        Пересчитывает габарит по отображениям (модель заново не обходится)
+        и записывает его в $EXTMIN/$EXTMAX сохраняемого файла.
+        """
+        extmin = list(self.extents.extmin)
+        extmax = list(self.extents.extmax)
+        for axis, mapping in mappings.items():
+            axis_index = _AXIS_INDEX[axis]
+            extmin[axis_index] = self._map_value(extmin[axis_index], mapping)
+            extmax[axis_index] = self._map_value(extmax[axis_index], mapping)
+        self.extents = BoundingBox([extmin, extmax])
+        # При сохранении ezdxf переписывает заголовок из атрибутов листа модели
+        msp = self.last_doc.modelspace()
+        msp.dxf.extmin = self.last_doc.header["$EXTMIN"] = Vec3(extmin)
+        msp.dxf.extmax = self.last_doc.header["$EXTMAX"] = Vec3(extmax)
+
     # ------------------------------------------------------------------ #
     @dataclass
     class Zone:
@@ -157,11 +326,30 @@ class DxfProcessor:
     class MappingSegment(Zone):
         start_new: float = 0.0
         end_new: float = 0.0
+        # Отображение участка: new = scale * old + offset
+        scale: float = field(init=False, default=1.0)
+        offset: float = field(init=False, default=0.0)
+
+        def __post_init__(self):
+            old_len = self.length
+            if old_len < 1e-9:
+                self.scale = 1.0
+                self.offset = self.start_new - self.start_old
+            else:
+                self.scale = self.length_new / old_len
+                self.offset = self.start_new - self.start_old * self.scale
 
         @property
         def length_new(self) -> float:
             return max(0.0, self.end_new - self.start_new)
 
+        def shifted(self, shift: float) -> "DxfProcessor.MappingSegment":
+            """Тот же участок, сдвинутый на shift (масштаб не пересчитывается)"""
+            segment = replace(self, start_new=self.start_new + shift, end_new=self.end_new + shift)
+            segment.scale = self.scale
+            segment.offset = self.offset + shift
+            return segment
+
     def _get_axis_bounds(self, axis: str) -> (float, float):
         if axis == "X":
             return self.extents.extmin.x, self.extents.extmax.x
@@ -171,15 +359,23 @@ class DxfProcessor:
         dxftype = entity.dxftype()
         if dxftype in {"CIRCLE", "ARC", "ELLIPSE", "SPLINE"}:
             return True
-        if dxftype in {"LWPOLYLINE", "POLYLINE"}:
-            try:
-                if any(abs(vertex.dxf.bulge) > 1e-6 for vertex in entity.vertices()):
-                    return True
-            except AttributeError:
-                pass
+        # Полилиния с дуговыми сегментами (bulge) — фиксированная
+        if dxftype == "LWPOLYLINE":
+            return any(abs(bulge) > 1e-6 for bulge, in entity.get_points("b"))
+        if dxftype == "POLYLINE":
+            return any(abs(vertex.dxf.bulge) > 1e-6 for vertex in entity.vertices)
         return False
 
     def _entity_interval(self, entity, axis: str) -> Optional[tuple]:
+        # Окружности, дуги и эллипсы в плоскости XY — по точным формулам,
+        # без построения BoundingBox для каждой сущности
+        dxftype = entity.dxftype()
+        if dxftype in {"CIRCLE", "ARC", "ELLIPSE"} and Z_AXIS.isclose(entity.dxf.extrusion):
+            axis_index = 0 if axis == "X" else 1
+            if dxftype == "ELLIPSE":
+                return _ellipse_interval(entity, axis_index)
+            return _arc_interval(entity, axis_index)
+
         try:
             ext = bbox.extents([entity])
         except Exception:
@@ -190,6 +386,17 @@ class DxfProcessor:
         end = ext.extmax.x if axis == "X" else ext.extmax.y
         return start, end
 
+    def _fixed_entities(self) -> list:
+        """
+        Фиксированные сущности модели. Проверка (в том числе bulge всех вершин
+        полилиний) выполняется один раз и используется для обеих осей
+        """
+        cached = self.zone_cache.get("fixed")
+        if cached is None:
+            cached = [entity for entity in self.last_doc.modelspace() if self._is_fixed_entity(entity)]
+            self.zone_cache["fixed"] = cached
+        return cached
+
     def _get_zones(self, axis: str) -> List["DxfProcessor.Zone"]:
         cached = self.zone_cache.get(axis)
         if cached:
@@ -200,9 +407,7 @@ class DxfProcessor:
             axis_max = axis_min
 
         intervals = []
-        for entity in self.last_doc.modelspace():
-            if not self._is_fixed_entity(entity):
-                continue
+        for entity in self._fixed_entities():
             interval = self._entity_interval(entity, axis)
             if interval:
                 start = max(axis_min, interval[0])
@@ -271,115 +476,216 @@ class DxfProcessor:
 
         return mapping
 
+    def _segment_ends(self, mapping: List["DxfProcessor.MappingSegment"]) -> List[float]:
+        """Концы участков с допуском — ключи двоичного поиска (считаются раз на отображение)"""
+        # По обеим осям сразу (X и Y поочерёдно) каждое отображение считается один раз
+        cached = self._mapping_ends.get(id(mapping))
+        if cached is not None and cached[0] is mapping:
+            return cached[1]
+        ends = [segment.end_old + 1e-9 for segment in mapping]
+        self._mapping_ends[id(mapping)] = (mapping, ends)
+        return ends
+
     def _map_value(self, value: float, mapping: List["DxfProcessor.MappingSegment"]) -> float:
-        eps = 1e-9
-        for segment in mapping:
-            if value < segment.start_old - eps:
-                continue
-            if value <= segment.end_old + eps:
-                old_len = segment.length
-                if old_len < eps:
-                    offset = segment.start_new - segment.start_old
-                    return value + offset
-                ratio = (value - segment.start_old) / old_len
-                return segment.start_new + ratio * segment.length_new
+        # Первый участок, чей конец (с допуском) не меньше значения
+        i = bisect_left(self._segment_ends(mapping), value)
+        if i < len(mapping):
+            segment = mapping[i]
+            if value >= segment.start_old - 1e-9:
+                return segment.scale * value + segment.offset
 
         offset = mapping[-1].end_new - mapping[-1].end_old
         return value + offset
 
+    def _map_values(self, values: np.ndarray, mapping: List["DxfProcessor.MappingSegment"]) -> np.ndarray:
+        """
+        Векторный вариант _map_value: те же правила для массива координат.
+
+        Расчёт выполняет core._remap (через numba или Cython, если они доступны).
+        """
+        return remap(
+            values,
+            np.array([segment.start_old for segment in mapping]),
+            np.array(self._segment_ends(mapping)),
+            np.array([segment.scale for segment in mapping]),
+            np.array([segment.offset for segment in mapping]),
+            mapping[-1].end_new - mapping[-1].end_old,
+        )
+
     def _apply_mapping(self, mapping: List["DxfProcessor.MappingSegment"], axis: str):
+        self._apply_mappings({axis: mapping})
+
+    def _apply_mappings(self, mappings: Dict[str, List["DxfProcessor.MappingSegment"]]):
+        """
+        Пересчитывает координаты по отображениям одной или обеих осей
+        за один обход modelspace.
+
+        mappings: {'X': отображение, 'Y': отображение} — любая из осей может отсутствовать
+        """
         msp = self.last_doc.modelspace()
+        lines = []
+        lwpolylines = []
+        splines = []
         for entity in msp:
             dxftype = entity.dxftype()
             try:
                 if dxftype == "LINE":
-                    self._map_line(entity, mapping, axis)
-                elif dxftype in {"LWPOLYLINE", "POLYLINE"}:
-                    self._map_polyline(entity, mapping, axis)
+                    lines.append(entity)
+                elif dxftype == "LWPOLYLINE":
+                    lwpolylines.append(entity)
+                elif dxftype == "POLYLINE":
+                    self._map_polyline(entity, mappings)
                 elif dxftype == "SPLINE":
-                    self._map_spline(entity, mapping, axis)
+                    splines.append(entity)
                 elif dxftype in {"CIRCLE", "ARC"}:
-                    self._map_circle_arc(entity, mapping, axis)
+                    self._map_circle_arc(entity, mappings)
                 elif dxftype == "POINT":
-                    self._map_point(entity, mapping, axis)
+                    self._map_point(entity, mappings)
                 else:
-                    self._map_generic(entity, mapping, axis)
+                    self._map_generic(entity, mappings)
             except Exception:
                 continue
 
-    def _map_line(self, entity, mapping, axis: str):
-        start = entity.dxf.start
-        end = entity.dxf.end
-        if axis == "X":
-            new_start = (self._map_value(start.x, mapping), start.y, start.z)
-            new_end = (self._map_value(end.x, mapping), end.y, end.z)
-        else:
-            new_start = (start.x, self._map_value(start.y, mapping), start.z)
-            new_end = (end.x, self._map_value(end.y, mapping), end.z)
-        entity.dxf.start = new_start
-        entity.dxf.end = new_end
-
-    def _map_polyline(self, entity, mapping, axis: str):
-        for vertex in entity.vertices():
-            if axis == "X":
-                vertex.dxf.x = self._map_value(vertex.dxf.x, mapping)
-            else:
-                vertex.dxf.y = self._map_value(vertex.dxf.y, mapping)
-
-    def _map_spline(self, entity, mapping, axis: str):
-        if hasattr(entity, "control_points"):
-            new_ctrl = []
-            for point in entity.control_points:
-                x, y, z = point
-                if axis == "X":
-                    new_ctrl.append((self._map_value(x, mapping), y, z))
-                else:
-                    new_ctrl.append((x, self._map_value(y, mapping), z))
-            entity.control_points = new_ctrl
-
-        if hasattr(entity, "fit_points") and entity.fit_points:
-            new_fit = []
-            for point in entity.fit_points:
-                x, y, z = point
-                if axis == "X":
-                    new_fit.append((self._map_value(x, mapping), y, z))
-                else:
-                    new_fit.append((x, self._map_value(y, mapping), z))
-            entity.fit_points = new_fit
+        if lines:
+            self._map_lines(lines, mappings)
+        if lwpolylines:
+            self._map_lwpolylines(lwpolylines, mappings)
+        if splines:
+            self._map_splines(splines, mappings)
+
+    def _map_columns(self, points: np.ndarray, mappings):
+        """Пересчитывает столбцы X/Y массива точек (N, >=2) на месте"""
+        for axis, mapping in mappings.items():
+            axis_index = _AXIS_INDEX[axis]
+            points[:, axis_index] = self._map_values(points[:, axis_index], mapping)
+
+    def _map_lines(self, lines, mappings):
+        """Отрезки пересчитываются одним массивом (2N, 3): начало и конец каждого"""
+        coords = np.array([point for line in lines for point in (line.dxf.start, line.dxf.end)],
+                          dtype=np.float64).reshape(-1, 3)
+        self._map_columns(coords, mappings)
+
+        for line, start, end in zip(lines, coords[0::2].tolist(), coords[1::2].tolist()):
+            try:
+                line.dxf.start = start
+                line.dxf.end = end
+            except Exception:
+                continue
 
-        if hasattr(entity, "knot_values") and entity.knot_values:
-            # координаты узлов не зависят от положения, поэтому не изменяем
-            pass
+    def _map_lwpolylines(self, polylines, mappings):
+        """
+        Вершины всех LWPOLYLINE читаются и записываются целиком (x, y, ширины, bulge)
+        и пересчитываются одним массивом
+        """
+        blocks = []
+        for polyline in polylines:
+            try:
+                points = np.array(polyline.get_points("xyseb"), dtype=np.float64).reshape(-1, 5)
+            except Exception:
+                continue
+            blocks.append((polyline, points))
+        if not blocks:
+            return
 
-    def _map_circle_arc(self, entity, mapping, axis: str):
-        center = entity.dxf.center
-        if axis == "X":
-            new_center = (self._map_value(center.x, mapping), center.y, center.z)
-        else:
-            new_center = (center.x, self._map_value(center.y, mapping), center.z)
-        entity.dxf.center = new_center
+        coords = np.concatenate([points for _, points in blocks])
+        self._map_columns(coords, mappings)
 
-    def _map_point(self, entity, mapping, axis: str):
-        location = entity.dxf.location
-        if axis == "X":
-            entity.dxf.location = (self._map_value(location.x, mapping), location.y, location.z)
-        else:
-            entity.dxf.location = (location.x, self._map_value(location.y, mapping), location.z)
+        pos = 0
+        for polyline, points in blocks:
+            points = coords[pos:pos + len(points)]
+            pos += len(points)
+            try:
+                polyline.set_points(points.tolist(), format="xyseb")
+            except Exception:
+                continue
+
+    def _map_polyline(self, entity, mappings):
+        """POLYLINE: вершины — отдельные сущности VERTEX"""
+        vertices = list(entity.vertices)
+        if not vertices:
+            return
+        coords = np.array([vertex.dxf.location for vertex in vertices], dtype=np.float64).reshape(-1, 3)
+        self._map_columns(coords, mappings)
+        for vertex, location in zip(vertices, coords.tolist()):
+            vertex.dxf.location = location
+
+    def _map_splines(self, splines, mappings):
+        """
+        Управляющие и определяющие точки всех сплайнов пересчитываются одним массивом.
+
+        ezdxf хранит точки сплайна в ndarray (VertexArray.values) — новые координаты
+        записываются прямо в него, без пересоздания списка точек через сеттер
+        """
+        blocks = []
+        for spline in splines:
+            try:
+                ctrl = _spline_points(spline.control_points)
+                fit = _spline_points(spline.fit_points)
+            except Exception:
+                continue
+            blocks.append((spline, ctrl, fit))
+        if not blocks:
+            return
+
+        coords = np.concatenate([points for _, ctrl, fit in blocks for points in (ctrl, fit)])
+        self._map_columns(coords, mappings)
 
-    def _map_generic(self, entity, mapping, axis: str):
+        pos = 0
+        for spline, ctrl, fit in blocks:
+            new_ctrl = coords[pos:pos + len(ctrl)]
+            pos += len(ctrl)
+            new_fit = coords[pos:pos + len(fit)]
+            pos += len(fit)
+            try:
+                if ctrl is _vertex_values(spline.control_points):
+                    ctrl[:] = new_ctrl
+                else:
+                    spline.control_points = new_ctrl.tolist()
+                if len(fit):
+                    if fit is _vertex_values(spline.fit_points):
+                        fit[:] = new_fit
+                    else:
+                        spline.fit_points = new_fit.tolist()
+            except Exception:
+                continue
+            # координаты узлов не зависят от положения, поэтому не изменяем
+
+    def _map_circle_arc(self, entity, mappings):
+        center = list(entity.dxf.center)
+        for axis, mapping in mappings.items():
+            axis_index = _AXIS_INDEX[axis]
+            center[axis_index] = self._map_value(center[axis_index], mapping)
+        entity.dxf.center = center
+
+    def _map_point(self, entity, mappings):
+        location = list(entity.dxf.location)
+        for axis, mapping in mappings.items():
+            axis_index = _AXIS_INDEX[axis]
+            location[axis_index] = self._map_value(location[axis_index], mapping)
+        entity.dxf.location = location
+
+    def _map_generic(self, entity, mappings):
         # Для остальных типов пытаемся применить матрицу преобразования
-        axis_index = 0 if axis == "X" else 1
-        offset = mapping[0].start_new - mapping[0].start_old
-        if axis_index == 0:
-            transform = Matrix44.translate(offset, 0, 0)
-        else:
-            transform = Matrix44.translate(0, offset, 0)
+        offset = [0.0, 0.0, 0.0]
+        for axis, mapping in mappings.items():
+            offset[_AXIS_INDEX[axis]] = mapping[0].start_new - mapping[0].start_old
         try:
-            entity.transform(transform)
+            entity.transform(Matrix44.translate(*offset))
         except Exception:
             pass
 
-    def _apply_anchor_shift(self, mapping, axis: str, anchor: str):
+    def _anchored_mapping(self, mapping, axis: str, anchor: str) -> List["DxfProcessor.MappingSegment"]:
+        """
+        Отображение, сразу оставляющее точку привязки на месте: сдвиг привязки
+        входит в участки, и отдельный перенос всей модели не нужен
+        """
+        shift = self._anchor_shift(mapping, axis, anchor)
+        if not shift:
+            return mapping
+        return [segment.shifted(shift) for segment in mapping]
+
+    def _anchor_shift(self, mapping, axis: str, anchor: str) -> float:
+        """Сдвиг по оси, возвращающий точку привязки на прежнее место (0.0, если не нужен)"""
         axis_min, axis_max = self._get_axis_bounds(axis)
         if anchor == "center":
             anchor_value = (axis_min + axis_max) / 2
@@ -391,17 +697,5 @@ class DxfProcessor:
         new_anchor = self._map_value(anchor_value, mapping)
         shift = anchor_value - new_anchor
         if abs(shift) < 1e-6:
-            return
-
-        if axis == "X":
-            transform = Matrix44.translate(shift, 0, 0)
-        else:
-            transform = Matrix44.translate(0, shift, 0)
-
-        for entity in self.last_doc.modelspace():
-            try:
-                entity.transform(transform)
-            except Exception:
-                continue
-
-
+            return 0.0
+        return shift
@@ -0,0 +1,58 @@
+"""
+Чтение нескольких DXF файлов целиком в память перед разбором
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+# Опционально: асинхронное чтение через aiofile (на Linux — io_uring/linux-aio через caio)
+try:
+    from aiofile import async_open
+    AIOFILE_AVAILABLE = sys.platform.startswith("linux")
+except ImportError:
+    AIOFILE_AVAILABLE = False
+    async_open = None
+
+# Потоков для чтения без aiofile: чтение упирается в диск, а не в процессор
+READ_THREADS = 4
+
+
+def read_file(path: Path) -> Optional[bytes]:
+    """Читает файл целиком; при ошибке возвращает None"""
+    try:
+        return Path(path).read_bytes()
+    except OSError:
+        return None
+
+
+async def _read_file_async(path: Path) -> bytes:
+    async with async_open(str(path), "rb") as afp:
+        return await afp.read()
+
+
+async def _read_all_async(paths: Sequence[Path]) -> List[Optional[bytes]]:
+    blobs = await asyncio.gather(*(_read_file_async(path) for path in paths), return_exceptions=True)
+    return [None if isinstance(blob, BaseException) else blob for blob in blobs]
+
+
+def read_many(paths: Sequence[Path]) -> List[Optional[bytes]]:
+    """
+    Читает все файлы и возвращает их содержимое в том же порядке.
+
+    На Linux с установленным aiofile все чтения отправляются ядру одной пачкой,
+    иначе читаются в пуле потоков. Для нечитаемого файла вместо байтов — None.
+    """
+    if not paths:
+        return []
+    if AIOFILE_AVAILABLE:
+        try:
+            return asyncio.run(_read_all_async(paths))
+        except Exception:
+            # Например, движок caio недоступен в этой системе
+            pass
+    with ThreadPoolExecutor(max_workers=min(READ_THREADS, len(paths))) as pool:
+        return list(pool.map(read_file, paths))
@@ -3,12 +3,20 @@
 """
 from __future__ import annotations
 
+import atexit
 import logging
+import os
+import queue
 import shutil
+import sys
 import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Callable, List, Optional, Sequence, Tuple
 
 from .dxf_processor import DxfProcessor, DxfInfo
 
@@ -20,9 +28,82 @@ except ImportError:
     KOMPAS_AVAILABLE = False
     KompasConnector = None
 
+# Кэш измерений DXF: (путь, mtime_ns, размер) -> DxfInfo.
+# Общий для всех экземпляров сервиса, ограничен по размеру (LRU).
+_MEASURE_CACHE: "OrderedDict[Tuple[str, int, int], DxfInfo]" = OrderedDict()
+_MEASURE_CACHE_SIZE = 256
+_MEASURE_LOCK = threading.Lock()
+
+# Буфер копирования файлов (1 МиБ): выделяется один раз на поток и переиспользуется
+_COPY_BUF_SIZE = 1 << 20
+_COPY_BUF = threading.local()
+
+# Сколько экспортированных DXF может ждать растяжения в batch_stretch. Экспорт
+# удаляется сразу после растяжения, поэтому на диске их не больше этого числа плюс потоки
+_BATCH_QUEUE_SIZE = 4
+
+
+def _copy_with_buf(src: Path, dst: Path):
+    """Копирует файл через переиспользуемый буфер и переносит время изменения (как copy2)"""
+    buf = getattr(_COPY_BUF, "buf", None)
+    if buf is None:
+        buf = _COPY_BUF.buf = bytearray(_COPY_BUF_SIZE)
+    view = memoryview(buf)
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        while True:
+            n = fsrc.readinto(view)
+            if not n:
+                break
+            fdst.write(view[:n])
+    shutil.copystat(src, dst)
+
+
+def _copy_sendfile(src: Path, dst: Path) -> bool:
+    """Копирование в ядре (os.sendfile); False — если система так не умеет"""
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        offset = 0
+        try:
+            while offset < size:
+                sent = os.sendfile(fdst.fileno(), fsrc.fileno(), offset, min(size - offset, 1 << 30))
+                if not sent:
+                    break
+                offset += sent
+        except OSError:
+            if offset:
+                raise
+            # Например, macOS: sendfile только в сокет
+            return False
+    shutil.copystat(src, dst)
+    return True
+
+
+def _copy_file_win32(src: Path, dst: Path) -> bool:
+    """Копирование средствами Windows (CopyFileExW, вместе с атрибутами и временем)"""
+    try:
+        import ctypes
+        return bool(ctypes.windll.kernel32.CopyFileExW(str(src), str(dst), None, None, None, 0))
+    except (ImportError, OSError, AttributeError):
+        return False
+
+
+def _copy_file(src: Path, dst: Path):
+    """Копирует файл средствами ОС без буфера в Python, если это возможно"""
+    if sys.platform == "win32":
+        if _copy_file_win32(src, dst):
+            return
+    elif hasattr(os, "sendfile") and _copy_sendfile(src, dst):
+        return
+    _copy_with_buf(src, dst)
+
 
 @dataclass
 class StretchResult:
+    # Без __dict__ у каждого экземпляра: в пакете их тысячи
+    # (dataclass(slots=True) появился только в Python 3.10)
+    __slots__ = ("source_file", "dxf_file", "current_length", "width", "target_length", "scale",
+                 "axis", "anchor", "stretched_dxf")
+
     source_file: Path
     dxf_file: Path
     current_length: float
@@ -34,6 +115,27 @@ class StretchResult:
     stretched_dxf: Optional[Path]
 
 
+def _stretch_file(file_path: str, dxf_path: Path, target_length: float, axis: str,
+                  anchor: str) -> StretchResult:
+    """Растягивает один DXF собственным DxfProcessor (для параллельных задач)"""
+    dxf = DxfProcessor()
+    info = dxf.load(str(dxf_path))
+    axis = axis.upper()
+    axis_length = info.length_x if axis == "X" else info.width_y
+    stretched = dxf.stretch(target_length, axis=axis, anchor=anchor)
+    return StretchResult(
+        source_file=Path(file_path),
+        dxf_file=dxf_path,
+        current_length=axis_length,
+        width=info.width_y,
+        target_length=target_length,
+        scale=target_length / axis_length,
+        axis=axis,
+        anchor=anchor,
+        stretched_dxf=stretched,
+    )
+
+
 class FlatPatternService:
     """Главный сервис: импорт, измерение, растяжение, экспорт"""
 
@@ -45,8 +147,22 @@ class FlatPatternService:
         self.current_dxf: Optional[Path] = None
         self.stretched_path: Optional[Path] = None
         self.current_axis: str = "X"
+        # False, если измерение взято из кэша и DXF ещё не загружен в self.dxf
+        self._doc_loaded = False
+        # True, пока stretched_path — промежуточный файл растяжения (его можно переносить)
+        self._stretched_is_temp = False
+        # Временная папка для DXF, экспортированных из КОМПАС (см. _temp_dir)
+        self._tmpdir: Optional[Path] = None
 
     # ------------------------------------------------------------------ #
+    @property
+    def _temp_dir(self) -> Path:
+        """Своя временная папка сервиса; создаётся при первом экспорте, удаляется при выходе"""
+        if self._tmpdir is None:
+            self._tmpdir = Path(tempfile.mkdtemp(prefix="fpstretch_"))
+            atexit.register(shutil.rmtree, self._tmpdir, ignore_errors=True)
+        return self._tmpdir
+
     def _export_via_kompas(self, file_path: Path) -> Path:
         """Экспортирует файл через КОМПАС в DXF (во временную папку)"""
         if not KOMPAS_AVAILABLE or not self.kompas:
@@ -60,9 +176,8 @@ class FlatPatternService:
         if not self.kompas.open_document(str(file_path)):
             raise RuntimeError("Не удалось открыть файл в КОМПАС-3D")
 
-        temp_dir = Path(tempfile.gettempdir()) / "flat_pattern_stretch"
-        temp_dir.mkdir(parents=True, exist_ok=True)
-        temp_dxf = temp_dir / f"{file_path.stem}_tmp.dxf"
+        # Уникальное имя: одноимённые файлы из разных папок и параллельные запуски не пересекаются
+        temp_dxf = self._temp_dir / f"{file_path.stem}_{uuid.uuid4().hex[:8]}_tmp.dxf"
 
         if not self.kompas.export_active_to_dxf(str(temp_dxf)):
             self.kompas.close_active_document(save=False)
@@ -73,17 +188,28 @@ class FlatPatternService:
 
     def _prepare_dxf(self, file_path: str) -> Path:
         """Возвращает путь к DXF (исходный или экспортированный через КОМПАС)"""
-        path = Path(file_path)
-        if path.suffix.lower() == ".dxf":
-            return path
-        return self._export_via_kompas(path)
+        # Проверка расширения строкой: на пути уже готового DXF без лишних объектов Path
+        if os.fspath(file_path).lower().endswith(".dxf"):
+            return Path(file_path)
+        return self._export_via_kompas(Path(file_path))
 
     # ------------------------------------------------------------------ #
     def measure(self, file_path: str, axis: str = "X") -> StretchResult:
         """Загружает файл и измеряет текущую длину развертки"""
         dxf_path = self._prepare_dxf(file_path)
-        info = self.dxf.load(str(dxf_path))
+        info = self._load_info(dxf_path)
+        return self._measure_result(file_path, dxf_path, info, axis)
+
+    def measure_from_bytes(self, data: bytes, file_path: str, axis: str = "X") -> StretchResult:
+        """
+        То же, что measure(), но содержимое DXF уже прочитано в память
+        (например, заранее в другом потоке). Только для файлов .dxf.
+        """
+        dxf_path = Path(file_path)
+        info = self._load_info(dxf_path, data)
+        return self._measure_result(file_path, dxf_path, info, axis)
 
+    def _measure_result(self, file_path: str, dxf_path: Path, info: DxfInfo, axis: str) -> StretchResult:
         self.current_info = info
         self.current_dxf = dxf_path
         self.stretched_path = None
@@ -102,15 +228,49 @@ class FlatPatternService:
             stretched_dxf=None,
         )
 
+    def _load_info(self, dxf_path: Path, data: Optional[bytes] = None) -> DxfInfo:
+        """
+        Возвращает габариты DXF, повторно не разбирая неизменённый файл.
+
+        При попадании в кэш сам документ не загружается — это сделает stretch(),
+        если до него дойдёт дело. data — уже прочитанное содержимое файла.
+        """
+        st = dxf_path.stat()
+        key = (str(dxf_path), st.st_mtime_ns, st.st_size)
+        with _MEASURE_LOCK:
+            info = _MEASURE_CACHE.get(key)
+            if info is not None:
+                _MEASURE_CACHE.move_to_end(key)
+        if info is not None:
+            self._doc_loaded = False
+            return info
+
+        if data is not None:
+            info = self.dxf.load_bytes(data, str(dxf_path))
+        else:
+            info = self.dxf.load(str(dxf_path))
+        self._doc_loaded = True
+        with _MEASURE_LOCK:
+            _MEASURE_CACHE[key] = info
+            if len(_MEASURE_CACHE) > _MEASURE_CACHE_SIZE:
+                _MEASURE_CACHE.popitem(last=False)
+        return info
+
     def stretch(self, target_length: float, axis: str = "X", anchor: str = "start") -> StretchResult:
         """Применяет коэффициент растяжения к текущей развертке"""
         if not self.current_info or not self.current_dxf:
             raise RuntimeError("Сначала необходимо выбрать файл и выполнить измерение.")
 
+        if not self._doc_loaded:
+            self.dxf.load(str(self.current_dxf))
+            self._doc_loaded = True
+
         axis = axis.upper()
         axis_length = self.current_info.length_x if axis == "X" else self.current_info.width_y
         stretched = self.dxf.stretch(target_length, axis=axis, anchor=anchor)
         self.stretched_path = stretched
+        # Без растяжения stretch() возвращает сам исходный файл — его не переносим
+        self._stretched_is_temp = stretched != self.current_dxf
 
         scale = target_length / axis_length
         return StretchResult(
@@ -125,19 +285,127 @@ class FlatPatternService:
             stretched_dxf=stretched,
         )
 
+    def batch_stretch(self, tasks: Sequence[Tuple[str, float, str, str]], max_workers: int = 4,
+                      on_done: Optional[Callable[[int, Optional[StretchResult], Optional[str]], None]] = None,
+                      ) -> List[Tuple[Optional[StretchResult], Optional[str]]]:
+        """
+        Растягивает несколько файлов конвейером: экспорт через КОМПАС идёт по одному
+        в вызывающем потоке, а растяжение уже готовых DXF — параллельно в пуле потоков.
+        DXF, экспортированный из КОМПАС, удаляется сразу после растяжения.
+
+        Args:
+            tasks: Список (файл, целевая длина, ось, точка привязки)
+            max_workers: Потоков растяжения
+            on_done: Вызывается для каждой задачи по готовности (номер, результат, ошибка);
+                     может вызываться из разных потоков
+
+        Returns:
+            Для каждой задачи по порядку: (StretchResult, None) или (None, текст ошибки)
+        """
+        results: List[Tuple[Optional[StretchResult], Optional[str]]] = [(None, None)] * len(tasks)
+        if not tasks:
+            return results
+        n_workers = max(1, min(max_workers, len(tasks)))
+        pending: "queue.Queue[Optional[Tuple[int, Path]]]" = queue.Queue(maxsize=_BATCH_QUEUE_SIZE)
+
+        def finish(index: int, result: Optional[StretchResult], error: Optional[str]):
+            results[index] = (result, error)
+            if on_done is not None:
+                on_done(index, result, error)
+
+        def consume():
+            while True:
+                item = pending.get()
+                if item is None:
+                    return
+                index, dxf_path = item
+                file_path, target_length, axis, anchor = tasks[index]
+                try:
+                    result, error = _stretch_file(file_path, dxf_path, target_length, axis, anchor), None
+                except Exception as e:
+                    result, error = None, str(e)
+                # Экспорт из КОМПАС больше не нужен, если растянутый файл — отдельный
+                if dxf_path != Path(file_path) and (result is None or result.stretched_dxf != dxf_path):
+                    try:
+                        dxf_path.unlink()
+                    except OSError:
+                        pass
+                finish(index, result, error)
+
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            consumers = [executor.submit(consume) for _ in range(n_workers)]
+            try:
+                for index, (file_path, *_rest) in enumerate(tasks):
+                    try:
+                        dxf_path = self._prepare_dxf(file_path)
+                    except Exception as e:
+                        finish(index, None, str(e))
+                        continue
+                    pending.put((index, dxf_path))
+            finally:
+                for _ in consumers:
+                    pending.put(None)
+        return results
+
     def save_stretched(self, output_path: str) -> Path:
-        """Сохраняет результат в указанное место"""
+        """
+        Сохраняет результат в указанное место.
+
+        Промежуточный файл растяжения переносится (на том же диске — без копирования
+        данных); дальше результатом считается сохранённый файл, и повторное
+        сохранение копирует уже его.
+        """
         if not self.stretched_path or not self.stretched_path.exists():
             raise RuntimeError("Ещё не выполнено растяжение.")
 
         destination = Path(output_path)
         destination.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(self.stretched_path, destination)
+        if self._stretched_is_temp:
+            try:
+                os.replace(self.stretched_path, destination)
+            except OSError:
+                # Другой диск (EXDEV) и т.п. — копируем
+                _copy_file(self.stretched_path, destination)
+            else:
+                self.stretched_path = destination
+                self._stretched_is_temp = False
+        elif destination.resolve() != self.stretched_path.resolve():
+            _copy_file(self.stretched_path, destination)
+        return destination
+
+    def save_result(self, result: StretchResult, output_path: str) -> Path:
+        """
+        Сохраняет результат batch_stretch в указанное место: промежуточный файл
+        растяжения переносится (на другой диск — копируется).
+        """
+        destination = Path(output_path)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        stretched = result.stretched_dxf or result.dxf_file
+        if stretched == result.source_file:
+            # Растягивать было нечего — сохраняется копия исходного файла
+            _copy_file(stretched, destination)
+            return destination
+        try:
+            os.replace(stretched, destination)
+        except OSError:
+            _copy_file(stretched, destination)
+            stretched.unlink()
         return destination
 
+    def discard_result(self, result: StretchResult):
+        """Удаляет промежуточный файл растяжения результата batch_stretch (если он есть)"""
+        stretched = result.stretched_dxf
+        if stretched is not None and stretched != result.source_file:
+            try:
+                stretched.unlink()
+            except OSError:
+                pass
+
     def clear(self):
         self.current_info = None
         self.current_dxf = None
         self.stretched_path = None
+        self._stretched_is_temp = False
+        self._doc_loaded = False
 
 
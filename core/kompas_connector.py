@@ -3,15 +3,101 @@
 """
 from __future__ import annotations
 
+import importlib.util
 import logging
 import os
+import threading
 import time
 from pathlib import Path
 from dataclasses import dataclass
-from typing import Optional
+from typing import Callable, Optional
 
-import pythoncom
-from win32com.client import Dispatch, DispatchEx
+# pywin32 импортируется при первом подключении: без него модуль не загружается
+# (ImportError, как и раньше), но DXF-сценарии не тратят время на импорт COM
+if importlib.util.find_spec("pythoncom") is None or importlib.util.find_spec("win32com") is None:
+    raise ImportError("Для работы с КОМПАС-3D нужен pywin32")
+
+pythoncom = None
+Dispatch = DispatchEx = None
+# Уведомления об изменениях в папке (тоже pywin32); без них — опрос файла
+win32file = win32event = win32con = None
+
+
+def _load_com():
+    """Импортирует pythoncom и win32com.client (один раз)"""
+    global pythoncom, Dispatch, DispatchEx, win32file, win32event, win32con
+    if pythoncom is None:
+        from win32com.client import Dispatch, DispatchEx
+        import pythoncom
+        try:
+            import win32con
+            import win32event
+            import win32file
+        except ImportError:
+            win32file = win32event = win32con = None
+
+
+# Подключение к КОМПАС, общее для всех коннекторов потока: при пакетной обработке
+# приложение не запускается и не ищется заново для каждого файла.
+# Объекты COM привязаны к потоку, поэтому хранится отдельно для каждого потока
+_APP_SINGLETON = threading.local()
+
+# Был ли в потоке вызван CoInitialize: повторно не вызывается до shutdown()
+_COM_INIT = threading.local()
+
+
+def _wait_until(predicate: Callable[[], object], timeout: float = 2.0, initial: float = 0.005) -> bool:
+    """
+    Ждёт, пока predicate() не вернёт истину: паузы 5, 10, 20 ... мс (не больше 0.1 с),
+    всего не дольше timeout. Возвращает, дождались ли.
+    """
+    deadline = time.monotonic() + timeout
+    delay = initial
+    while True:
+        try:
+            if predicate():
+                return True
+        except Exception:
+            pass
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, 0.1)
+
+
+def _open_change_handle(folder: Path):
+    """Подписка на изменения файлов в папке (FindFirstChangeNotification) или None"""
+    if win32file is None:
+        return None
+    try:
+        return win32file.FindFirstChangeNotification(
+            str(folder), False,
+            win32con.FILE_NOTIFY_CHANGE_FILE_NAME | win32con.FILE_NOTIFY_CHANGE_LAST_WRITE
+            | win32con.FILE_NOTIFY_CHANGE_SIZE,
+        )
+    except Exception:
+        return None
+
+
+def _wait_for_change(handle, predicate: Callable[[], object], timeout: float) -> bool:
+    """
+    Как _wait_until, но predicate() проверяется по сигналу об изменении в папке,
+    а не по таймеру. Возвращает, дождались ли.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if predicate():
+                return True
+        except Exception:
+            pass
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        # После таймаута цикл ещё раз проверит predicate() и завершится
+        if win32event.WaitForSingleObject(handle, int(remaining * 1000) + 1) == win32event.WAIT_OBJECT_0:
+            win32file.FindNextChangeNotification(handle)
 
 
 @dataclass
@@ -32,6 +118,8 @@ class KompasConnector:
         self.settings = settings or KompasSettings()
         self.application = None
         self.connected = False
+        # API 5 (ksSaveToDXF): Dispatch выполняется один раз на подключение
+        self._api5 = None
 
     # ------------------------------------------------------------------ #
     # Подключение / отключение
@@ -41,11 +129,26 @@ class KompasConnector:
         if self.connected and not force and self.application:
             return True
 
-        try:
-            pythoncom.CoInitialize()
-        except pythoncom.com_error:
-            # Уже инициализировано в текущем потоке
-            pass
+        # Уже открытое в этом потоке подключение, если КОМПАС ещё отвечает
+        application = getattr(_APP_SINGLETON, "application", None)
+        if application is not None and not force:
+            try:
+                application.Visible
+                self.application = application
+                self.connected = True
+                return True
+            except Exception:
+                _APP_SINGLETON.application = None
+
+        _load_com()
+        if not getattr(_COM_INIT, "done", False):
+            try:
+                pythoncom.CoInitialize()
+                _COM_INIT.owned = True
+            except pythoncom.com_error:
+                # Уже инициализировано в текущем потоке (не нами — и освобождать не нам)
+                _COM_INIT.owned = False
+            _COM_INIT.done = True
 
         try:
             self.logger.info(f"Подключение к КОМПАС ({self.settings.prog_id})")
@@ -56,6 +159,8 @@ class KompasConnector:
 
             self.application.Visible = bool(self.settings.visible)
             self.application.HideMessage = 0
+            _APP_SINGLETON.application = self.application
+            self._api5 = None
             self.connected = True
             self.logger.info("КОМПАС подключён")
             return True
@@ -65,17 +170,28 @@ class KompasConnector:
             return False
 
     def disconnect(self):
-        """Отключение от КОМПАС-3D"""
+        """
+        Отключение от КОМПАС-3D. COM в потоке остаётся инициализированным
+        для следующего connect(); освобождается в shutdown().
+        """
         if not self.connected:
             return
         self.logger.info("Отключение от КОМПАС-3D")
         self.application = None
-        try:
-            pythoncom.CoUninitialize()
-        except pythoncom.com_error:
-            pass
+        _APP_SINGLETON.application = None
+        self._api5 = None
         self.connected = False
 
+    def shutdown(self):
+        """Отключение и освобождение COM в текущем потоке (при завершении работы)"""
+        self.disconnect()
+        if getattr(_COM_INIT, "owned", False):
+            try:
+                pythoncom.CoUninitialize()
+            except pythoncom.com_error:
+                pass
+        _COM_INIT.done = _COM_INIT.owned = False
+
     # ------------------------------------------------------------------ #
     # Работа с документами
     # ------------------------------------------------------------------ #
@@ -93,7 +209,8 @@ class KompasConnector:
             doc = self.application.Documents.Open(str(path), False, False)
             if doc:
                 self.application.ActiveDocument = doc
-                time.sleep(0.5)
+                # Ждём, пока документ станет активным
+                _wait_until(lambda: self.application.ActiveDocument is not None, timeout=2.0)
                 self.logger.info(f"Открыт документ: {doc.Name}")
                 return True
         except Exception as exc:
@@ -127,8 +244,9 @@ class KompasConnector:
             return False
 
         try:
-            api5 = Dispatch("Kompas.Application.5")
-            doc2d = api5.ActiveDocument2D
+            if self._api5 is None:
+                self._api5 = Dispatch("Kompas.Application.5")
+            doc2d = self._api5.ActiveDocument2D
             if not doc2d:
                 self.logger.error("ActiveDocument2D не найден")
                 return False
@@ -138,8 +256,19 @@ class KompasConnector:
             if out_path.exists():
                 out_path.unlink()
 
-            result = doc2d.ksSaveToDXF(str(out_path))
-            time.sleep(1)
+            # Подписка до сохранения, чтобы не пропустить появление файла
+            handle = _open_change_handle(out_path.parent)
+            try:
+                result = doc2d.ksSaveToDXF(str(out_path))
+                # Ждём появления непустого файла
+                ready = lambda: out_path.exists() and out_path.stat().st_size > 0
+                if handle is not None:
+                    _wait_for_change(handle, ready, timeout=5.0)
+                else:
+                    _wait_until(ready, timeout=5.0)
+            finally:
+                if handle is not None:
+                    win32file.FindCloseChangeNotification(handle)
             if result and out_path.exists():
                 self.logger.info(f"DXF сохранён: {out_path}")
                 return True
@@ -2,140 +2,484 @@
 Скрипт создания развертки внешнего радиуса из внутреннего
 для случаев, когда конфигурация отверстий идентична
 """
+import fnmatch
+import glob
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+from dataclasses import dataclass
 from pathlib import Path
-from core.flat_pattern_service import FlatPatternService
-from core.base_analyzer import BaseAnalyzer
+from typing import Callable, Dict, List, Optional, Tuple
 
+from core.flat_pattern_service import KOMPAS_AVAILABLE, FlatPatternService
+from core.dxf_processor import read_header_extents
+from core.base_analyzer import BaseAnalyzer, BaseInfo, ENTRY_RADIUS, _classify_name, _parse_korpus
 
-def create_outer_from_inner(inner_radius_file: str, korpus_number: int, output_name: str = None):
+log = logging.getLogger("create_outer_from_inner")
+
+# Потоков пакетной обработки по умолчанию
+BATCH_WORKERS = 8
+
+# Файлы КОМПАС, которые пакет экспортирует в DXF (только если КОМПАС доступен)
+_KOMPAS_SUFFIXES = (".cdw", ".m3d")
+
+# Файл основания: "Основание*корп{N}*.dxf" без учёта регистра
+_BASE_NAME_RE = re.compile(r"основание.*?корп(\d+).*?\.dxf$", re.IGNORECASE)
+
+
+class _BufferedStreamHandler(logging.StreamHandler):
     """
-    Создает развертку внешнего радиуса на основе внутреннего.
-    
-    Args:
-        inner_radius_file: Путь к DXF файлу внутреннего радиуса
-        korpus_number: Номер корпуса (1, 2, 3, ...)
-        output_name: Имя выходного файла (по умолчанию: auto)
-    
-    Пример:
-        create_outer_from_inner(
-            "test/Внутренний радиус Г1.корп4 - 1шт.dxf",
-            korpus_number=4,
-            output_name="Внешний радиус Г1.корп4 - 1шт.dxf"
-        )
+    Вывод в консоль без сброса после каждой строки: на Windows каждая запись
+    в консоль — отдельный системный вызов. Буфер сбрасывается перед вопросами
+    пользователю (_flush_log) и при выходе.
+    """
+
+    def flush(self):
+        pass
+
+    def flush_now(self):
+        self.acquire()
+        try:
+            self.stream.flush()
+        finally:
+            self.release()
+
+    def close(self):
+        self.flush_now()
+        super().close()
+
+
+def setup_logging(quiet: bool = False):
+    """Настраивает вывод сообщений скрипта (quiet — только предупреждения и ошибки)"""
+    log.setLevel(logging.WARNING if quiet else logging.INFO)
+    if log.handlers:
+        return
+    if sys.stdout is None:
+        # pythonw: консоли нет
+        handler = logging.NullHandler()
+    else:
+        # Тот же поток, что и у print(): порядок вывода сохраняется
+        handler = _BufferedStreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(handler)
+    log.propagate = False
+
+
+def _flush_log():
+    for handler in log.handlers:
+        if isinstance(handler, _BufferedStreamHandler):
+            handler.flush_now()
+
+
+@dataclass
+class OuterRadiusResult:
+    """Итог обработки одного файла: все числа для вывода (_render)"""
+    inner_path: Path
+    base_path: Path
+    base_info: BaseInfo
+    target_length: float
+    header_length: Optional[float] = None   # длина по заголовку DXF (если файл не разбирался)
+    current_length: Optional[float] = None
+    status: str = ""                        # same / shorter / cancelled / saved
+    scale: float = 1.0
+    stretched_name: str = ""
+    saved_path: Optional[Path] = None
+
+    @property
+    def delta(self) -> float:
+        length = self.current_length if self.current_length is not None else self.header_length
+        return self.target_length - length
+
+
+def build_dir_index(folder) -> Dict[int, Path]:
+    """Файлы оснований папки по номеру корпуса (один проход по папке)"""
+    index = {}
+    with os.scandir(folder) as it:
+        names = sorted((entry.name, entry.path) for entry in it if entry.is_file())
+    for name, path in names:
+        match = _BASE_NAME_RE.match(name)
+        if match:
+            index.setdefault(int(match.group(1)), Path(path))
+    return index
+
+
+def _prepare(inner_radius_file: str, korpus_number: int,
+             dir_index: Optional[Dict[int, Path]] = None) -> OuterRadiusResult:
+    """
+    Основание и целевая длина для файла. Если по заголовку DXF длина уже целевая,
+    результат сразу со статусом same (файл целиком не разбирается).
+    dir_index — готовый build_dir_index() папки файла (иначе папка читается здесь).
     """
-    
-    print("="*80)
-    print("СОЗДАНИЕ ВНЕШНЕГО РАДИУСА ИЗ ВНУТРЕННЕГО")
-    print("="*80)
-    print()
-    
     inner_path = Path(inner_radius_file)
     
     if not inner_path.exists():
         raise FileNotFoundError(f"Файл не найден: {inner_radius_file}")
     
     # Поиск основания для получения целевой длины
-    test_dir = inner_path.parent
-    base_files = list(test_dir.glob(f"Основание*корп{korpus_number}*.dxf")) + \
-                 list(test_dir.glob(f"Основание*корп{korpus_number}*.DXF"))
+    if dir_index is None:
+        dir_index = build_dir_index(inner_path.parent)
+    base_file = dir_index.get(korpus_number)
     
-    if not base_files:
+    if base_file is None:
         raise FileNotFoundError(
             f"Не найден файл основания для корп{korpus_number}\n"
             f"Ожидается: Основание Г1.корп{korpus_number} - 1шт.dxf"
         )
+    base_info = BaseAnalyzer().get_base_info(base_file)
     
-    base_file = base_files[0]
+    # Целевая длина = длина дуги 1 (внешней) из основания
+    result = OuterRadiusResult(inner_path=inner_path, base_path=base_file, base_info=base_info,
+                               target_length=base_info.outer_radius_length)
     
-    # Анализ основания
-    print(f"📁 Исходный файл:  {inner_path.name}")
-    print(f"📐 Файл основания: {base_file.name}")
-    print()
+    # Габарит из заголовка DXF: если длина уже целевая, файл целиком не разбираем
+    header_extents = read_header_extents(inner_path)
+    if header_extents is not None and abs(result.target_length - header_extents.size.x) < 0.01:
+        result.header_length = header_extents.size.x
+        result.status = "same"
+    return result
+
+
+def _accept_length(result: OuterRadiusResult, force: bool,
+                   confirm: Optional[Callable[[OuterRadiusResult], bool]]) -> bool:
+    """
+    Проверка измеренной длины: нужно ли растягивать. Если нет — выставляет статус.
     
-    analyzer = BaseAnalyzer()
-    base_info = analyzer._analyze_base_file(base_file)
+    Если целевая длина меньше текущей: при force обработка продолжается,
+    иначе решает confirm (без него файл пропускается со статусом shorter).
+    """
+    delta = result.delta
+    if abs(delta) < 0.01:
+        result.status = "same"
+        return False
     
-    print("Информация из основания:")
-    print(f"  Дуга 1 (внешняя):  R={base_info.arc1.radius:.3f} мм, L={base_info.arc1.arc_length:.3f} мм")
-    print(f"  Дуга 2 (внутренняя): R={base_info.arc2.radius:.3f} мм, L={base_info.arc2.arc_length:.3f} мм")
-    print(f"  Разница: {base_info.arc1.arc_length - base_info.arc2.arc_length:.3f} мм")
-    print()
+    if delta < 0 and not force:
+        if confirm is None:
+            result.status = "shorter"
+            return False
+        if not confirm(result):
+            result.status = "cancelled"
+            return False
+    return True
+
+
+def _output_path(inner_path: Path, output_name: Optional[str]) -> Path:
+    if output_name:
+        return inner_path.parent / output_name
+    # Автоматическое имя: заменяем "Внутренний" на "Внешний"
+    auto_name = inner_path.stem.replace("Внутренний", "Внешний").replace("внутренний", "Внешний")
+    return inner_path.parent / f"{auto_name}_from_inner.dxf"
+
+
+def _do_work(inner_radius_file: str, korpus_number: int, output_name: Optional[str] = None,
+             force: bool = False,
+             confirm: Optional[Callable[[OuterRadiusResult], bool]] = None) -> OuterRadiusResult:
+    """Расчёт и сохранение внешнего радиуса для одного файла без вывода в консоль"""
+    result = _prepare(inner_radius_file, korpus_number)
+    if result.status:
+        return result
     
-    # Обработка
+    # Измеряем текущую длину внутреннего радиуса
     service = FlatPatternService()
+    result.current_length = service.measure(str(result.inner_path), axis="X").current_length
     
-    # Измеряем текущую длину внутреннего радиуса
-    print("📏 Измерение внутреннего радиуса...")
-    measure_result = service.measure(str(inner_path), axis="X")
-    current_length = measure_result.current_length
-    print(f"  Текущая длина: {current_length:.3f} мм")
-    print()
+    if not _accept_length(result, force, confirm):
+        return result
     
-    # Целевая длина = длина дуги 1 (внешней) из основания
-    target_length = base_info.outer_radius_length
+    # Выполняем растяжение
+    stretched = service.stretch(result.target_length, axis="X", anchor="start")
+    result.scale = stretched.scale
+    result.stretched_name = stretched.stretched_dxf.name
     
-    print(f"🎯 Целевая длина (дуга 1): {target_length:.3f} мм")
-    print()
+    result.saved_path = service.save_stretched(str(_output_path(result.inner_path, output_name)))
+    result.status = "saved"
+    return result
+
+
+def _render_analysis(result: OuterRadiusResult):
+    """Вывод исходных данных и проверки длин"""
+    base_info = result.base_info
+    log.info("="*80)
+    log.info("СОЗДАНИЕ ВНЕШНЕГО РАДИУСА ИЗ ВНУТРЕННЕГО")
+    log.info("="*80)
+    log.info("")
+    log.info(f"📁 Исходный файл:  {result.inner_path.name}")
+    log.info(f"📐 Файл основания: {result.base_path.name}")
+    log.info("")
+    log.info("Информация из основания:")
+    log.info(f"  Дуга 1 (внешняя):  R={base_info.arc1.radius:.3f} мм, L={base_info.arc1.arc_length:.3f} мм")
+    log.info(f"  Дуга 2 (внутренняя): R={base_info.arc2.radius:.3f} мм, L={base_info.arc2.arc_length:.3f} мм")
+    log.info(f"  Разница: {base_info.arc1.arc_length - base_info.arc2.arc_length:.3f} мм")
+    log.info("")
     
-    # Проверка
-    delta = target_length - current_length
-    if abs(delta) < 0.01:
-        print("⚠️  ВНИМАНИЕ: Длины уже совпадают!")
-        print("   Возможно, у вас уже внешний радиус, а не внутренний?")
+    if result.current_length is None:
+        log.info(f"  Длина по заголовку DXF: {result.header_length:.3f} мм")
+    else:
+        log.info("📏 Измерение внутреннего радиуса...")
+        log.info(f"  Текущая длина: {result.current_length:.3f} мм")
+        log.info("")
+    log.info(f"🎯 Целевая длина (дуга 1): {result.target_length:.3f} мм")
+    log.info("")
+    
+    if result.status == "same":
+        log.warning("⚠️  ВНИМАНИЕ: Длины уже совпадают!")
+        log.warning("   Возможно, у вас уже внешний радиус, а не внутренний?")
+    elif result.delta < 0:
+        log.warning("⚠️  ВНИМАНИЕ: Целевая длина МЕНЬШЕ текущей!")
+        log.warning("   Обычно внешний радиус ДЛИННЕЕ внутреннего.")
+        log.warning("   Проверьте правильность входных данных.")
+
+
+def _render_output(result: OuterRadiusResult):
+    """Вывод результата растяжения и сохранения"""
+    if result.status == "shorter":
+        log.warning("   Пропущено.")
+        return
+    if result.status == "cancelled":
+        log.warning("Отменено пользователем.")
+        return
+    if result.status != "saved":
         return
     
-    if delta < 0:
-        print("⚠️  ВНИМАНИЕ: Целевая длина МЕНЬШЕ текущей!")
-        print("   Обычно внешний радиус ДЛИННЕЕ внутреннего.")
-        print("   Проверьте правильность входных данных.")
-        response = input("   Продолжить? (y/n): ")
-        if response.lower() != 'y':
-            print("Отменено пользователем.")
-            return
+    delta = result.delta
+    log.info(f"📊 Операция: УДЛИНЕНИЕ на {delta:+.3f} мм ({delta/result.current_length*100:+.2f}%)")
+    log.info("")
+    log.info("⚙️  Обработка...")
+    log.info(f"✅ Готово!")
+    log.info(f"   Коэффициент: {result.scale:.6f}")
+    log.info(f"   Результат: {result.stretched_name}")
+    log.info("")
+    log.info("="*80)
+    log.info("💾 ФАЙЛ СОХРАНЁН")
+    log.info("="*80)
+    log.info(f"Путь: {result.saved_path}")
+    log.info("")
+    log.info("ПРОВЕРЬТЕ РЕЗУЛЬТАТ:")
+    log.info("1. Откройте файл в CAD программе")
+    log.info("2. Измерьте длину по оси X")
+    log.info(f"3. Должно быть: {result.target_length:.3f} мм")
+    log.info("4. Проверьте, что отверстия не искажены")
+    log.info("5. Проверьте, что дуги гибов сохранили форму")
+    log.info("="*80)
+
+
+def _render(result: OuterRadiusResult):
+    _render_analysis(result)
+    _render_output(result)
+
+
+def create_outer_from_inner(inner_radius_file: str, korpus_number: int, output_name: str = None,
+                            interactive: bool = True, force: bool = False):
+    """
+    Создает развертку внешнего радиуса на основе внутреннего.
     
-    print(f"📊 Операция: УДЛИНЕНИЕ на {delta:+.3f} мм ({delta/current_length*100:+.2f}%)")
-    print()
+    Args:
+        inner_radius_file: Путь к DXF файлу внутреннего радиуса
+        korpus_number: Номер корпуса (1, 2, 3, ...)
+        output_name: Имя выходного файла (по умолчанию: auto)
+        interactive: Спрашивать подтверждение, если целевая длина меньше текущей
+                     (без него такой файл пропускается)
+        force: Растягивать без подтверждения, даже если целевая длина меньше текущей
     
-    # Выполняем растяжение
-    print("⚙️  Обработка...")
-    result = service.stretch(target_length, axis="X", anchor="start")
+    Пример:
+        create_outer_from_inner(
+            "test/Внутренний радиус Г1.корп4 - 1шт.dxf",
+            korpus_number=4,
+            output_name="Внешний радиус Г1.корп4 - 1шт.dxf"
+        )
+    """
+    if not log.handlers:
+        setup_logging()
     
-    print(f"✅ Готово!")
-    print(f"   Коэффициент: {result.scale:.6f}")
-    print(f"   Результат: {result.stretched_dxf.name}")
-    print()
+    asked = False
     
-    # Сохранение
-    if output_name:
-        output_path = test_dir / output_name
+    def confirm(partial: OuterRadiusResult) -> bool:
+        nonlocal asked
+        asked = True
+        _render_analysis(partial)
+        _flush_log()
+        response = input("   Продолжить? (y/n): ")
+        return response.lower() == 'y'
+    
+    result = _do_work(inner_radius_file, korpus_number, output_name, force=force,
+                      confirm=confirm if interactive else None)
+    if not asked:
+        _render_analysis(result)
+    _render_output(result)
+    return result.saved_path
+
+
+def find_inner_files(pattern: str) -> List[Tuple[str, int, Optional[str]]]:
+    """
+    Задачи пакета: файлы внутренних радиусов в папке или по маске
+    с номером корпуса из имени файла.
+    
+    Маска имени файла сравнивается без учёта регистра (как в Windows),
+    папка при этом читается один раз. Берутся только DXF (и файлы КОМПАС, если он
+    доступен); из одноимённых DXF и файла КОМПАС остаётся DXF — результат у них общий.
+    """
+    if os.path.isdir(pattern):
+        with os.scandir(pattern) as it:
+            paths = [entry.path for entry in it if entry.is_file()]
     else:
-        # Автоматическое имя: заменяем "Внутренний" на "Внешний"
-        auto_name = inner_path.stem.replace("Внутренний", "Внешний").replace("внутренний", "Внешний")
-        output_path = test_dir / f"{auto_name}_from_inner.dxf"
+        folder, mask = os.path.split(pattern)
+        if any(char in folder for char in "*?["):
+            # Маска в пути папки — обычный glob
+            paths = glob.glob(pattern)
+        else:
+            rx = re.compile(fnmatch.translate(mask), re.IGNORECASE)
+            try:
+                with os.scandir(folder or os.curdir) as it:
+                    paths = [os.path.join(folder, entry.name) for entry in it
+                             if entry.is_file() and rx.match(entry.name)]
+            except OSError:
+                paths = []
+
+    suffixes = (".dxf",) + (_KOMPAS_SUFFIXES if KOMPAS_AVAILABLE else ())
+    tasks = []
+    by_stem: Dict[str, int] = {}  # папка/имя без расширения в нижнем регистре -> индекс в tasks
+    for path in sorted(paths):
+        name = os.path.basename(path)
+        if _classify_name(name) != ENTRY_RADIUS or not name.lower().startswith("внутренний"):
+            continue
+        stem, suffix = os.path.splitext(path)
+        suffix = suffix.lower()
+        if suffix not in suffixes:
+            continue
+        try:
+            korpus_number = int(_parse_korpus(name)[len("корп"):])
+        except ValueError:
+            log.warning(f"⚠️  Пропущен {name}: не найден номер корпуса")
+            continue
+        index = by_stem.get(stem.lower())
+        if index is None:
+            by_stem[stem.lower()] = len(tasks)
+            tasks.append((path, korpus_number, None))
+            continue
+        kept, skipped = tasks[index][0], path
+        if suffix == ".dxf":
+            # DXF обрабатывается без КОМПАС
+            tasks[index] = (path, korpus_number, None)
+            kept, skipped = path, kept
+        log.warning(f"⚠️  Пропущен {os.path.basename(skipped)}: есть {os.path.basename(kept)}")
+    return tasks
+
+
+def create_outer_from_inner_batch(tasks: List[Tuple[str, int, Optional[str]]],
+                                  max_workers: int = BATCH_WORKERS,
+                                  force: bool = False) -> Tuple[List[Path], int]:
+    """
+    Создает внешние радиусы для нескольких файлов.
     
-    saved_path = service.save_stretched(str(output_path))
+    Файлы растягиваются конвейером FlatPatternService.batch_stretch: экспорт из КОМПАС
+    идёт по одному, растяжение готовых DXF — параллельно. Проверка длин, сохранение
+    и вывод — в вызывающем потоке по мере готовности результатов.
     
-    print("="*80)
-    print("💾 ФАЙЛ СОХРАНЁН")
-    print("="*80)
-    print(f"Путь: {saved_path}")
-    print()
-    print("ПРОВЕРЬТЕ РЕЗУЛЬТАТ:")
-    print("1. Откройте файл в CAD программе")
-    print("2. Измерьте длину по оси X")
-    print(f"3. Должно быть: {target_length:.3f} мм")
-    print("4. Проверьте, что отверстия не искажены")
-    print("5. Проверьте, что дуги гибов сохранили форму")
-    print("="*80)
+    Args:
+        tasks: Список (файл внутреннего радиуса, номер корпуса, имя выходного файла или None)
+        max_workers: Число потоков растяжения
+        force: Растягивать и файлы, у которых целевая длина меньше текущей
+               (без него такие файлы пропускаются)
+    
+    Returns:
+        (пути сохранённых файлов, число ошибок). Файлы, которые уже нужной длины
+        или пропущены из-за меньшей целевой длины, ошибками не считаются.
+    """
+    saved = []
+    errors = 0
+    # Основания ищутся по индексу: каждая папка читается один раз на весь пакет
+    dir_indexes = {}
+    pending: List[Tuple[OuterRadiusResult, Optional[str]]] = []
+    for inner_file, korpus_number, output_name in tasks:
+        folder = Path(inner_file).parent
+        if folder not in dir_indexes:
+            dir_indexes[folder] = build_dir_index(folder)
+        try:
+            result = _prepare(inner_file, korpus_number, dir_indexes[folder])
+        except Exception as e:
+            log.error(f"\n❌ ОШИБКА ({Path(inner_file).name}): {e}")
+            errors += 1
+            continue
+        if result.status:
+            _render(result)
+        else:
+            pending.append((result, output_name))
+    if not pending:
+        return saved, errors
+    
+    service = FlatPatternService()
+    stretch_tasks = [(str(result.inner_path), result.target_length, "X", "start") for result, _ in pending]
+    done = queue.SimpleQueue()
+    failure = []
     
-    return saved_path
+    def run():
+        try:
+            service.batch_stretch(stretch_tasks, max_workers,
+                                  on_done=lambda index, stretched, error: done.put((index, stretched, error)))
+        except Exception as e:
+            failure.append(e)
+        finally:
+            done.put(None)
+    
+    runner = threading.Thread(target=run, daemon=True)
+    runner.start()
+    while True:
+        item = done.get()
+        if item is None:
+            break
+        index, stretched, error = item
+        result, output_name = pending[index]
+        if error:
+            log.error(f"\n❌ ОШИБКА ({result.inner_path.name}): {error}")
+            errors += 1
+            continue
+        result.current_length = stretched.current_length
+        if _accept_length(result, force, None):
+            result.scale = stretched.scale
+            result.stretched_name = stretched.stretched_dxf.name
+            try:
+                output_path = _output_path(result.inner_path, output_name)
+                result.saved_path = service.save_result(stretched, str(output_path))
+            except OSError as e:
+                log.error(f"\n❌ ОШИБКА ({result.inner_path.name}): {e}")
+                service.discard_result(stretched)
+                errors += 1
+                continue
+            result.status = "saved"
+            saved.append(result.saved_path)
+        else:
+            # Длина не подошла — растянутый файл не нужен
+            service.discard_result(stretched)
+        _render(result)
+    runner.join()
+    if failure:
+        raise failure[0]
+    return saved, errors
 
 
 def main():
     """Пример использования"""
-    import sys
+    # -q / --quiet: выводить только предупреждения и ошибки
+    # --force: в пакетном режиме растягивать и файлы с целевой длиной меньше текущей
+    quiet = any(arg in ("-q", "--quiet") for arg in sys.argv[1:])
+    force = "--force" in sys.argv[1:]
+    args = [arg for arg in sys.argv[1:] if arg not in ("-q", "--quiet", "--force")]
+    setup_logging(quiet)
     
-    if len(sys.argv) < 3:
+    if len(args) == 1:
+        tasks = find_inner_files(args[0])
+        if not tasks:
+            log.error(f"❌ Не найдено файлов внутренних радиусов: {args[0]}")
+            sys.exit(1)
+        saved, errors = create_outer_from_inner_batch(tasks, force=force)
+        log.warning(f"\nОбработано файлов: {len(saved)} из {len(tasks)}")
+        if errors:
+            log.warning(f"Ошибок: {errors}")
+        sys.exit(1 if errors else 0)
+
+    if len(args) < 2:
         print("ИСПОЛЬЗОВАНИЕ:")
         print("  python create_outer_from_inner.py <файл_внутреннего_радиуса> <номер_корпуса> [имя_выходного_файла]")
         print()
@@ -145,6 +489,13 @@ def main():
         print("ИЛИ с указанием выходного имени:")
         print('  python create_outer_from_inner.py "test/Внутренний радиус Г1.корп4 - 1шт.dxf" 4 "Внешний радиус Г1.корп4 - 1шт.dxf"')
         print()
+        print("ПАКЕТНО (все внутренние радиусы папки или по маске, корпус — из имени файла):")
+        print('  python create_outer_from_inner.py test')
+        print('  python create_outer_from_inner.py "test/Внутренний*.dxf"')
+        print()
+        print("  -q, --quiet — выводить только предупреждения и ошибки")
+        print("  --force     — в пакетном режиме не пропускать файлы, где целевая длина меньше текущей")
+        print()
         
         # Интерактивный режим
         print("="*80)
@@ -161,24 +512,21 @@ def main():
         try:
             create_outer_from_inner(inner_file, korpus, output)
         except Exception as e:
-            print(f"\n❌ ОШИБКА: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception(f"\n❌ ОШИБКА: {e}")
         
+        _flush_log()
         input("\nНажмите Enter для выхода...")
         return
     
     # Аргументы командной строки
-    inner_file = sys.argv[1]
-    korpus_number = int(sys.argv[2])
-    output_name = sys.argv[3] if len(sys.argv) > 3 else None
+    inner_file = args[0]
+    korpus_number = int(args[1])
+    output_name = args[2] if len(args) > 2 else None
     
     try:
         create_outer_from_inner(inner_file, korpus_number, output_name)
     except Exception as e:
-        print(f"\n❌ ОШИБКА: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception(f"\n❌ ОШИБКА: {e}")
         sys.exit(1)
 
 